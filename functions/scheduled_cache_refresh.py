@@ -1,33 +1,42 @@
 """
 Cloud Function for scheduled cache refresh
-Automatically scheduled by Firebase (runs daily at 6:00 AM)
+Automatically scheduled by Firebase (runs every hour)
 """
 
+import logging
+from pathlib import Path
+
+# Project root, passed to init_once so every entry point shares one cache key
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
 # Initialize Firebase Admin (if not already initialized)
-import firebase_admin
+from web.firebase_init import init_once
 try:
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app()
-except ValueError:
-    # Already initialized - this is OK
-    pass
+    init_once(PROJECT_ROOT)
+except Exception as e:
+    # Don't fail the import (and with it main.py's discovery of every function);
+    # Firestore access reports the problem when the function actually runs
+    logger.warning(f"Firebase Admin initialization error: {e}", exc_info=True)
 
 from firebase_functions import scheduler_fn
-from web.cache_refresh import refresh_stale_caches
+from web.cache_refresh import refresh_stale_caches, REFRESH_BATCH_SIZE
 
 
-@scheduler_fn.on_schedule(schedule="every day 06:00", timezone="America/New_York")
+# A run refreshes up to REFRESH_BATCH_SIZE caches one after another, which needs
+# far more than the default 60s timeout
+@scheduler_fn.on_schedule(schedule="every 1 hours", timezone="America/New_York", timeout_sec=540)
 def scheduled_cache_refresh(event: scheduler_fn.ScheduledEvent) -> None:
     """
     Refresh stale project caches by fetching fresh data from Respondent.io API.
-    Runs daily at 6:00 AM to keep caches up to date.
+    Runs hourly, refreshing at most REFRESH_BATCH_SIZE of the oldest stale caches per run.
     """
     try:
-        # Refresh stale caches (default max age: 24 hours)
-        refresh_stale_caches(max_age_hours=24)
+        # Refresh the oldest caches past the max age (default: 24 hours)
+        refresh_stale_caches(max_age_hours=24, limit=REFRESH_BATCH_SIZE)
         print("[Cache Refresh] Scheduled task completed successfully")
-    except Exception as e:
-        print(f"[Cache Refresh] Error in scheduled task: {e}")
-        import traceback
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("[Cache Refresh] Error in scheduled task")
         raise
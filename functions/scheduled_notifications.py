@@ -5,26 +5,27 @@ Automatically scheduled by Firebase (runs every Friday morning at 9:00 AM)
 
 import os
 import sys
-import firebase_admin
+import logging
 from pathlib import Path
 
 # Add parent directory to path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
 # Initialize Firebase Admin (if not already initialized)
+from web.firebase_init import init_once
 try:
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app()
-except ValueError:
-    # Already initialized - this is OK
-    pass
-except ImportError:
-    # firebase_admin not available
-    pass
+    init_once(PROJECT_ROOT)
+except Exception as e:
+    # Don't fail the import (and with it main.py's discovery of every function);
+    # Firestore access reports the problem when the function actually runs
+    logger.warning(f"Firebase Admin initialization error: {e}", exc_info=True)
 
 from firebase_functions import scheduler_fn
-from web.notification_scheduler import check_and_send_weekly_notifications, check_and_send_token_expiration_notifications
+from web.notification_scheduler import check_and_send_all_notifications
 
 
 @scheduler_fn.on_schedule(schedule="every friday 09:00", timezone="America/New_York")
@@ -34,15 +35,10 @@ def scheduled_notifications(event: scheduler_fn.ScheduledEvent) -> None:
     Runs every Friday morning at 9:00 AM to check for users who need notifications.
     """
     try:
-        # Check weekly notifications
-        check_and_send_weekly_notifications()
-        
-        # Check token expiration notifications
-        check_and_send_token_expiration_notifications()
+        # Check weekly and token expiration notifications in one pass over users
+        check_and_send_all_notifications()
         
         print("[Notifications] Scheduled task completed successfully")
-    except Exception as e:
-        print(f"[Notifications] Error in scheduled task: {e}")
-        import traceback
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("[Notifications] Error in scheduled task")
         raise
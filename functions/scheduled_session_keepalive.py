@@ -3,14 +3,23 @@ Cloud Function for scheduled session keep-alive
 Automatically scheduled by Firebase (runs every 8 hours)
 """
 
+import logging
+from pathlib import Path
+
+# Project root, passed to init_once so every entry point shares one cache key
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
 # Initialize Firebase Admin (if not already initialized)
-import firebase_admin
+from web.firebase_init import init_once
 try:
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app()
-except ValueError:
-    # Already initialized - this is OK
-    pass
+    init_once(PROJECT_ROOT)
+except Exception as e:
+    # Don't fail the import (and with it main.py's discovery of every function);
+    # Firestore access reports the problem when the function actually runs
+    logger.warning(f"Firebase Admin initialization error: {e}", exc_info=True)
 
 from firebase_functions import scheduler_fn
 from web.cache_refresh import keep_sessions_alive
@@ -26,8 +35,6 @@ def scheduled_session_keepalive(event: scheduler_fn.ScheduledEvent) -> None:
         # Keep all sessions alive by checking profile endpoints
         keep_sessions_alive()
         print("[Session Keep-Alive] Scheduled task completed successfully")
-    except Exception as e:
-        print(f"[Session Keep-Alive] Error in scheduled task: {e}")
-        import traceback
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("[Session Keep-Alive] Error in scheduled task")
         raise
@@ -23,28 +23,14 @@ if str(PROJECT_ROOT) not in sys.path:
 # For local development, it can be set in .env.yaml or PROJECT_ID env var
 # Note: Cannot use FIREBASE_PROJECT_ID as env var (reserved prefix)
 
-# Check if we're in cloud environment
-is_cloud = bool(os.environ.get('GCP_PROJECT') or os.environ.get('GCLOUD_PROJECT') or 
-                os.environ.get('FUNCTION_NAME') or os.environ.get('K_SERVICE'))
+from web.firebase_init import is_cloud_environment, resolve_project_id, init_once
 
-# Get project ID from environment variables (Cloud Functions sets these automatically)
-project_id = (os.environ.get('GCP_PROJECT') or 
-              os.environ.get('GCLOUD_PROJECT') or 
-              os.environ.get('PROJECT_ID'))
+# Check if we're in cloud environment
+is_cloud = is_cloud_environment()
 
-# For local development, try reading from .firebaserc
-if not project_id:
-    try:
-        import json
-        firebaserc_path = PROJECT_ROOT / '.firebaserc'
-        if firebaserc_path.exists():
-            with open(firebaserc_path, 'r') as f:
-                firebaserc = json.load(f)
-                project_id = firebaserc.get('projects', {}).get('default')
-                if project_id:
-                    logger.info(f"Read project ID from .firebaserc: {project_id}")
-    except Exception as e:
-        logger.debug(f"Could not read .firebaserc: {e}")
+# Get project ID from environment variables (Cloud Functions sets these automatically),
+# falling back to .firebaserc for local development. Resolved once per process.
+project_id = resolve_project_id(PROJECT_ROOT)
 
 # In cloud environment, project ID must be available
 if not project_id:
@@ -66,18 +52,7 @@ else:
 
 # Initialize Firebase Admin (if not already initialized)
 try:
-    from web.firebase_init import initialize_firebase_admin
-    initialize_firebase_admin(project_id=project_id, project_root=PROJECT_ROOT)
-except ImportError as e:
-    logger.warning(f"Could not import firebase_init: {e}")
-    # Fallback to basic initialization
-    try:
-        import firebase_admin
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app()
-            logger.info("Firebase Admin initialized (fallback)")
-    except Exception as fallback_error:
-        logger.warning(f"Firebase Admin initialization failed: {fallback_error}", exc_info=True)
+    init_once(PROJECT_ROOT)
 except Exception as e:
     logger.warning(f"Firebase Admin initialization error: {e}", exc_info=True)
 
@@ -103,96 +78,74 @@ def get_app():
 # For Cloud Functions 2nd Gen, create an HTTP function wrapper for the Flask app
 # Functions-framework expects a callable function, not a Flask app object
 from functions_framework import http
+from werkzeug.wrappers import Response
 
 @http
 def respondentpro(request):
     """
     HTTP function wrapper for Flask app
-    Converts the Cloud Functions request to Flask's WSGI interface
+    Passes the Cloud Functions request's WSGI environ to the Flask app
     """
     # Lazy load the app only when the function is called
     app = get_app()
     
-    # Convert headers to dict (functions-framework provides them as a case-insensitive dict-like object)
-    headers = dict(request.headers)
-    
     # Extract Cookie header - Firebase Hosting only forwards __session cookie to Cloud Functions
-    # Try to get Cookie header from headers
-    cookie_header = None
-    
-    # Try all case variations
-    for key in headers.keys():
-        if key.lower() == 'cookie':
-            cookie_header = headers[key]
-            break
+    # Werkzeug headers are case-insensitive, so a single lookup covers every casing
+    cookie_header = request.headers.get('Cookie', '')
     
-    # If not in headers dict, try request.headers directly
-    if not cookie_header:
-        try:
-            cookie_header = request.headers.get('Cookie') or request.headers.get('cookie')
-        except:
-            pass
-    
-    # If still not found, check if functions-framework provides cookies as attribute
-    if not cookie_header and hasattr(request, 'cookies') and request.cookies:
-        cookie_parts = [f"{name}={value}" for name, value in request.cookies.items()]
-        if cookie_parts:
-            cookie_header = '; '.join(cookie_parts)
-    
-    # Flask's test_request_context needs cookies in environ_base as HTTP_COOKIE
-    environ_base = {}
+    # Debug: Verify the cookies Flask will see (parsed from the same WSGI environ)
     if cookie_header:
-        environ_base['HTTP_COOKIE'] = cookie_header
-        logger.debug(f"Cookie header found, setting HTTP_COOKIE: {cookie_header[:100]}...")
+        logger.debug(f"Cookie header found: {cookie_header[:200]}...")
+        logger.debug(f"Parsed cookies keys: {list(request.cookies.keys())}")
+        if 'firebase_id_token' in request.cookies:
+            logger.debug("✓ firebase_id_token cookie successfully parsed!")
+        else:
+            logger.warning(f"✗ firebase_id_token NOT in cookies. Available: {list(request.cookies.keys())}")
     else:
-        logger.debug("No cookie header in request")
+        logger.warning("No cookie header was extracted from request")
     
-    # Flask's test_request_context should parse cookies from the Cookie header
-    # But if it doesn't, we need to ensure they're in the WSGI environ
-    # The key is that Flask's Request class looks for cookies in environ['HTTP_COOKIE']
-    # But test_request_context might not set this from headers automatically
-    
-    with app.test_request_context(
-        path=request.path,
-        method=request.method,
-        headers=headers,
-        data=request.get_data(),
-        query_string=request.query_string.decode('utf-8') if request.query_string else '',
-        environ_base=environ_base
-    ):
-        # Debug: Verify cookies were parsed by Flask
-        if cookie_header:
-            logger.debug(f"Cookie header was: {cookie_header[:200]}...")
-            logger.debug(f"Flask parsed cookies keys: {list(request.cookies.keys())}")
-            if 'firebase_id_token' in request.cookies:
-                logger.debug("✓ firebase_id_token cookie successfully parsed!")
-            else:
-                logger.warning(f"✗ firebase_id_token NOT in cookies. Available: {list(request.cookies.keys())}")
-                logger.warning(f"Request environ HTTP_COOKIE: {request.environ.get('HTTP_COOKIE', 'NOT SET')[:200]}")
-        else:
-            logger.warning("No cookie header was extracted from request")
-        
-        # Process the request through Flask
-        response = app.full_dispatch_request()
-        
-        # Convert Flask response to functions-framework compatible format
-        # The response should be returned directly - functions-framework handles it
-        return response
+    # Dispatch straight into the Flask WSGI app with the incoming environ
+    # The environ already carries the path, query string, headers (including HTTP_COOKIE) and body,
+    # so no intermediate request context needs to be built
+    return Response.from_app(app, request.environ)
+
+
+@http
+def healthz(request):
+    """
+    Lightweight liveness probe served without loading the Flask app
+    Use the Flask /health route for a full dependency check
+    """
+    return ('ok', 200, {'Content-Type': 'text/plain'})
 
 
 # Import scheduled functions so Firebase can discover them
 # These functions use @scheduler_fn.on_schedule decorators which register them automatically
-try:
-    from functions.scheduled_notifications import scheduled_notifications
-except ImportError as e:
-    logger.warning(f"Could not import scheduled_notifications: {e}")
+# At runtime Cloud Functions sets FUNCTION_TARGET to the entry point being served, so an
+# instance serving respondentpro skips importing the scheduler modules. During deploy-time
+# discovery FUNCTION_TARGET is unset and every function is imported.
+FUNCTION_TARGET = os.environ.get('FUNCTION_TARGET')
 
-try:
-    from functions.scheduled_cache_refresh import scheduled_cache_refresh
-except ImportError as e:
-    logger.warning(f"Could not import scheduled_cache_refresh: {e}")
 
-try:
-    from functions.scheduled_session_keepalive import scheduled_session_keepalive
-except ImportError as e:
-    logger.warning(f"Could not import scheduled_session_keepalive: {e}")
+def _should_import(function_name):
+    """Check whether a function's module is needed for discovery or for the entry point being served"""
+    return not FUNCTION_TARGET or FUNCTION_TARGET == function_name
+
+
+if _should_import('scheduled_notifications'):
+    try:
+        from functions.scheduled_notifications import scheduled_notifications
+    except Exception as e:
+        logger.warning(f"Could not import scheduled_notifications: {e}")
+
+if _should_import('scheduled_cache_refresh'):
+    try:
+        from functions.scheduled_cache_refresh import scheduled_cache_refresh
+    except Exception as e:
+        logger.warning(f"Could not import scheduled_cache_refresh: {e}")
+
+if _should_import('scheduled_session_keepalive'):
+    try:
+        from functions.scheduled_session_keepalive import scheduled_session_keepalive
+    except Exception as e:
+        logger.warning(f"Could not import scheduled_session_keepalive: {e}")
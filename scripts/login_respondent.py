@@ -43,13 +43,16 @@ def print_raw_request(method, url, headers):
     if parsed.query:
         path += f"?{parsed.query}"
     
-    print("  Raw HTTP Request:")
-    print("  " + "-" * 76)
-    print(f"  {method} {path} HTTP/1.1")
-    print(f"  Host: {parsed.netloc}")
-    for key, value in headers.items():
-        print(f"  {key}: {value}")
-    print("  " + "-" * 76)
+    # Build the whole block first and write it once instead of one print per line
+    lines = [
+        "  Raw HTTP Request:",
+        "  " + "-" * 76,
+        f"  {method} {path} HTTP/1.1",
+        f"  Host: {parsed.netloc}",
+    ]
+    lines.extend(f"  {key}: {value}" for key, value in headers.items())
+    lines.append("  " + "-" * 76)
+    print("\n".join(lines))
 
 
 def main():
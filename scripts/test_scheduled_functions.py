@@ -4,18 +4,22 @@ Test script for scheduled functions
 Run individual scheduled functions locally for testing
 
 Usage:
-    python scripts/test_scheduled_functions.py [--function FUNCTION_NAME]
+    python scripts/test_scheduled_functions.py [--function FUNCTION_NAME] [--fail-fast] [--verbose]
     
 Examples:
     python scripts/test_scheduled_functions.py --function notifications
     python scripts/test_scheduled_functions.py --function cache-refresh
     python scripts/test_scheduled_functions.py --function session-keepalive
     python scripts/test_scheduled_functions.py  # Runs all functions
+    python scripts/test_scheduled_functions.py --fail-fast  # Runs one at a time, stops at first failure
 """
 
 import os
 import sys
+import logging
+import importlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -23,109 +27,93 @@ from typing import Optional
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-# Try to load environment variables from .env
-try:
-    from dotenv import load_dotenv
-    load_dotenv(PROJECT_ROOT / '.env')
-except ImportError:
-    pass
+from web.env_utils import load_env, first_env
 
-# Set up environment variables if not already set
+# Load environment variables from .env (only needed when the environment hasn't
+# already been populated) and set up PROJECT_ID if not already set. The web
+# modules imported later reuse this load instead of re-parsing .env.
 if not os.environ.get('PROJECT_ID'):
-    project_id = (
-        os.environ.get('GCP_PROJECT') or
-        os.environ.get('GCLOUD_PROJECT') or
-        os.environ.get('PROJECT_ID') or
-        'respondentpro'  # Default fallback
+    load_env()
+    os.environ['PROJECT_ID'] = first_env(
+        'GCP_PROJECT', 'GCLOUD_PROJECT', 'PROJECT_ID',
+        default='respondentpro'  # Default fallback
     )
-    os.environ['PROJECT_ID'] = project_id
 
+# Test output goes through logging: each record is written under the handler's
+# lock, so output from concurrently running tests doesn't interleave mid-line
+logger = logging.getLogger("sched_tests")
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
 
-def test_notifications():
-    """Test the notifications scheduled function"""
-    print("=" * 80)
-    print("Testing scheduled_notifications")
-    print("=" * 80)
-    
-    try:
-        # For local testing, call the underlying functions directly
-        # The scheduler wrapper is just for deployment - the actual logic is in these functions
-        from web.notification_scheduler import (
-            check_and_send_weekly_notifications,
-            check_and_send_token_expiration_notifications
-        )
-        
-        print("Calling check_and_send_weekly_notifications()...")
-        check_and_send_weekly_notifications()
-        
-        print("Calling check_and_send_token_expiration_notifications()...")
-        check_and_send_token_expiration_notifications()
-        
-        print("\n✓ Notifications test completed successfully")
-        return True
-    except ImportError as e:
-        print(f"\n✗ Import error: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-    except Exception as e:
-        print(f"\n✗ Notifications test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+# Include full tracebacks for failures (set by --verbose or TEST_VERBOSE=1)
+VERBOSE = os.environ.get('TEST_VERBOSE', '0') == '1'
 
 
-def test_cache_refresh():
-    """Test the cache refresh scheduled function"""
-    print("=" * 80)
-    print("Testing scheduled_cache_refresh")
-    print("=" * 80)
-    
-    try:
-        # For local testing, call the underlying function directly
-        from web.cache_refresh import refresh_stale_caches
-        
-        print("Calling refresh_stale_caches(max_age_hours=24)...")
-        refresh_stale_caches(max_age_hours=24)
-        
-        print("\n✓ Cache refresh test completed successfully")
-        return True
-    except ImportError as e:
-        print(f"\n✗ Import error: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
-    except Exception as e:
-        print(f"\n✗ Cache refresh test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+def print_banner(title):
+    """Log a section banner as a single record so concurrent tests don't interleave it"""
+    logger.info("\n".join(["=" * 80, title, "=" * 80]))
+
+
+def log_failure(message, e):
+    """Log a test failure, with the traceback only in verbose mode"""
+    if VERBOSE:
+        logger.exception(message)
+    else:
+        logger.error(f"{message}\n  (rerun with --verbose for traceback; type={type(e).__name__})")
+
 
+# Scheduled functions by CLI name: (deployed function, label, module, calls).
+# For local testing the underlying functions are called directly - the
+# scheduler wrappers are just for deployment.
+TESTS = {
+    "notifications": (
+        "scheduled_notifications", "Notifications",
+        "web.notification_scheduler", [("check_and_send_all_notifications", {})],
+    ),
+    "cache-refresh": (
+        "scheduled_cache_refresh", "Cache refresh",
+        "web.cache_refresh", [("refresh_stale_caches", {"max_age_hours": 24})],
+    ),
+    "session-keepalive": (
+        "scheduled_session_keepalive", "Session keep-alive",
+        "web.cache_refresh", [("keep_sessions_alive", {})],
+    ),
+}
 
-def test_session_keepalive():
-    """Test the session keep-alive scheduled function"""
-    print("=" * 80)
-    print("Testing scheduled_session_keepalive")
-    print("=" * 80)
+
+def run_test(name):
+    """
+    Run one scheduled function's underlying calls
+    
+    The module is imported only when the test runs, so skipped tests cost nothing.
+    
+    Args:
+        name: Key in TESTS
+        
+    Returns:
+        bool: True if every call completed without raising
+    """
+    function_name, label, module_path, calls = TESTS[name]
+    print_banner(f"Testing {function_name}")
     
     try:
-        # For local testing, call the underlying function directly
-        from web.cache_refresh import keep_sessions_alive
+        module = importlib.import_module(module_path)
         
-        print("Calling keep_sessions_alive()...")
-        keep_sessions_alive()
+        for fn_name, kwargs in calls:
+            args_str = ", ".join(f"{key}={value!r}" for key, value in kwargs.items())
+            logger.info(f"Calling {fn_name}({args_str})...")
+            getattr(module, fn_name)(**kwargs)
         
-        print("\n✓ Session keep-alive test completed successfully")
+        logger.info(f"\n✓ {label} test completed successfully")
         return True
     except ImportError as e:
-        print(f"\n✗ Import error: {e}")
-        import traceback
-        traceback.print_exc()
+        log_failure(f"\n✗ Import error: {e}", e)
         return False
     except Exception as e:
-        print(f"\n✗ Session keep-alive test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        log_failure(f"\n✗ {label} test failed: {e}", e)
         return False
 
 
@@ -142,48 +130,76 @@ Examples:
   python scripts/test_scheduled_functions.py --function cache-refresh
   python scripts/test_scheduled_functions.py --function session-keepalive
   python scripts/test_scheduled_functions.py  # Runs all functions
+  python scripts/test_scheduled_functions.py --fail-fast  # Runs one at a time, stops at first failure
         """
     )
     
     parser.add_argument(
         "--function",
-        choices=["notifications", "cache-refresh", "session-keepalive", "all"],
+        choices=[*TESTS, "all"],
         default="all",
         help="Which function to test (default: all)"
     )
     
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Run functions one at a time and stop at the first failure, "
+             "skipping the imports for the remaining ones"
+    )
+    
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print full tracebacks for failures"
+    )
+    
     args = parser.parse_args()
     
-    print("=" * 80)
-    print("Scheduled Functions Local Test")
-    print("=" * 80)
-    print(f"Project ID: {os.environ.get('PROJECT_ID', 'not set')}")
-    print(f"Testing: {args.function}")
-    print("=" * 80)
-    print()
+    global VERBOSE
+    VERBOSE = VERBOSE or args.verbose
     
-    results = {}
+    logger.info("=" * 80)
+    logger.info("Scheduled Functions Local Test")
+    logger.info("=" * 80)
+    logger.info(f"Project ID: {os.environ.get('PROJECT_ID', 'not set')}")
+    logger.info(f"Testing: {args.function}")
+    logger.info("=" * 80)
+    logger.info("")
     
-    if args.function == "notifications" or args.function == "all":
-        results["notifications"] = test_notifications()
-        print()
+    selected = list(TESTS) if args.function == "all" else [args.function]
     
-    if args.function == "cache-refresh" or args.function == "all":
-        results["cache-refresh"] = test_cache_refresh()
-        print()
+    results = {}
     
-    if args.function == "session-keepalive" or args.function == "all":
-        results["session-keepalive"] = test_session_keepalive()
-        print()
+    if len(selected) == 1 or args.fail_fast:
+        # Each test imports its module when it runs, so stopping early also
+        # skips the import cost of the remaining functions
+        for name in selected:
+            results[name] = run_test(name)
+            logger.info("")
+            if args.fail_fast and not results[name]:
+                break
+    else:
+        # The functions are independent and I/O-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+            futures = {executor.submit(run_test, name): name for name in selected}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        logger.info("")
+        # Report in the usual order regardless of completion order
+        results = {name: results[name] for name in selected}
     
     # Summary
-    print("=" * 80)
-    print("Test Summary")
-    print("=" * 80)
-    for name, success in results.items():
-        status = "✓ PASSED" if success else "✗ FAILED"
-        print(f"{name:30} {status}")
-    print("=" * 80)
+    logger.info("=" * 80)
+    logger.info("Test Summary")
+    logger.info("=" * 80)
+    for name in selected:
+        if name not in results:
+            status = "- SKIPPED"
+        else:
+            status = "✓ PASSED" if results[name] else "✗ FAILED"
+        logger.info(f"{name:30} {status}")
+    logger.info("=" * 80)
     
     # Exit with error code if any test failed
     if not all(results.values()):
@@ -2,12 +2,27 @@
 """
 Session Timeout Test Script
 
-Tests cookie session timeout by repeatedly sending GET requests with
-cumulative 4-hour delays until the session expires.
+Finds the cookie session idle timeout by sending GET requests separated by
+increasing delays. Delays double until a request fails, then the timeout is
+narrowed down by bisecting between the longest delay that succeeded and the
+shortest one that failed. Each failed probe needs a fresh session cookie to
+continue.
+
+Usage:
+    python scripts/test_session_timeout.py
+    python scripts/test_session_timeout.py --cookies cookies.txt
+
+With --cookies, every session cookie in the file (one per line) is probed in
+parallel until its first expiry, without prompting.
 """
+import argparse
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # Configuration
@@ -15,7 +30,8 @@ from datetime import datetime, timedelta
 
 URL = "https://app.respondent.io/api/v4/profiles/user/691f593aabd77eb5a29c7b35"
 COOKIE_VALUE = "s"
-DELAY_INCREMENT_HOURS = 1
+DELAY_INCREMENT_HOURS = 1  # First probe delay; doubled until the session expires
+TOLERANCE_HOURS = 0.5  # Stop once the timeout is bracketed to within this many hours
 REQUEST_TIMEOUT = 10  # Request timeout in seconds (2 minutes)
 
 # Headers
@@ -27,6 +43,39 @@ headers = {
 }
 
 
+
+def create_session(cookie_value):
+    """Create a session with a single pooled keep-alive connection for one cookie."""
+    session = requests.Session()
+    session.headers.update(headers)
+    session.headers["Cookie"] = f"respondent.session.sid={cookie_value}"
+    session.mount("https://", HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        # Transient network errors and gateway failures are retried here, with
+        # exponential backoff, instead of by the probe loops
+        max_retries=Retry(
+            total=5,
+            backoff_factor=2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(["GET"])
+        )
+    ))
+    return session
+
+
+# Reused across probes so each request rides the pooled keep-alive connection
+# instead of opening a new TCP+TLS connection
+SESSION = create_session(COOKIE_VALUE)
+
+# Serializes output when several cookies are probed in parallel
+_print_lock = threading.Lock()
+
+# Set by the main thread on Ctrl-C so parallel probes stop waiting; signals are
+# only delivered to the main thread, so the workers have to be told
+_stop_event = threading.Event()
+
+
 def format_time_delta(hours):
     """Format time delta in hours to a human-readable string."""
     if hours < 24:
@@ -45,13 +94,91 @@ def print_raw_request(method, url, headers):
     if parsed.query:
         path += f"?{parsed.query}"
     
-    print("  Raw HTTP Request:")
-    print("  " + "-" * 76)
-    print(f"  {method} {path} HTTP/1.1")
-    print(f"  Host: {parsed.netloc}")
-    for key, value in headers.items():
+    # Build the whole block first and write it once instead of one print per line
+    lines = [
+        "  Raw HTTP Request:",
+        "  " + "-" * 76,
+        f"  {method} {path} HTTP/1.1",
+        f"  Host: {parsed.netloc}",
+    ]
+    lines.extend(f"  {key}: {value}" for key, value in headers.items())
+    lines.append("  " + "-" * 76)
+    print("\n".join(lines))
+
+
+def next_delay(lo_hours, hi_hours):
+    """Pick the next idle delay: double until the first expiry, then bisect."""
+    if hi_hours is None:
+        return max(DELAY_INCREMENT_HOURS, lo_hours * 2)
+    return (lo_hours + hi_hours) / 2
+
+
+def wait_hours(hours, label=None):
+    """
+    Sleep for the given number of hours, printing progress every hour.
+    
+    Waits on _stop_event against a monotonic deadline, so clock changes don't
+    stretch or shorten the wait and parallel probes return as soon as the main
+    thread sets the event. In the main thread, Ctrl-C interrupts the wait directly.
+    
+    Args:
+        hours: How long to wait
+        label: Probe label to prefix progress lines with (parallel probes only)
+        
+    Returns:
+        bool: True if the full wait elapsed, False if _stop_event was set
+    """
+    sleep_interval = 3600  # Update every 1 hour (3600 seconds)
+    start = time.monotonic()
+    deadline = start + hours * 3600
+    
+    while (remaining_seconds := deadline - time.monotonic()) > 0:
+        # Wait in chunks to allow progress updates
+        if _stop_event.wait(min(sleep_interval, remaining_seconds)):
+            return False
+        remaining_seconds = deadline - time.monotonic()
+        
+        # Show progress every hour
+        if remaining_seconds > 0:
+            elapsed_hours = (time.monotonic() - start) / 3600
+            remaining_hours = remaining_seconds / 3600
+            message = (f"[Progress] Elapsed: {format_time_delta(elapsed_hours)}, "
+                       f"Remaining: {format_time_delta(remaining_hours)}")
+            if label:
+                log(label, message)
+            else:
+                print(f"  {message}", flush=True)
+    return True
+
+
+def print_timeout_response(response):
+    """Print the full HTTP response of a request that found the session expired."""
+    print()
+    print("=" * 80)
+    print("SESSION TIMEOUT DETECTED")
+    print("=" * 80)
+    print()
+    
+    # Full HTTP response
+    print("Full HTTP Response:")
+    print("-" * 80)
+    print(f"Status Code: {response.status_code}")
+    print(f"Status Reason: {response.reason}")
+    print()
+    print("Response Headers:")
+    for key, value in response.headers.items():
         print(f"  {key}: {value}")
-    print("  " + "-" * 76)
+    print()
+    print("Response Body:")
+    print("-" * 80)
+    try:
+        # Try to decode as JSON first
+        print(response.json())
+    except:
+        # Fall back to text
+        print(response.text)
+    print("-" * 80)
+    print()
 
 
 def main():
@@ -60,7 +187,7 @@ def main():
     print("Session Timeout Test Script")
     print("=" * 80)
     print(f"Target URL: {URL}")
-    print(f"Starting delay increment: {DELAY_INCREMENT_HOURS} hours")
+    print(f"First probe delay: {DELAY_INCREMENT_HOURS} hours (doubling, then bisecting to {TOLERANCE_HOURS} hours)")
     print("=" * 80)
     print()
 
@@ -70,7 +197,7 @@ def main():
     print_raw_request("GET", URL, headers)
     print("  Sending request...", end=" ", flush=True)
     try:
-        baseline_response = requests.get(URL, headers=headers, timeout=REQUEST_TIMEOUT)
+        baseline_response = SESSION.get(URL, timeout=REQUEST_TIMEOUT)
         print(f"Status: {baseline_response.status_code}")
         
         if baseline_response.status_code != 200:
@@ -101,12 +228,22 @@ def main():
 
     request_count = 0
     delay_hours = 0
+    lo_hours = 0  # Longest idle delay the session survived
+    hi_hours = None  # Shortest idle delay after which the session had expired
     start_time = datetime.now()
     last_request_time = None
     total_elapsed = timedelta(0)
 
     try:
         while True:
+            delay_hours = next_delay(lo_hours, hi_hours)
+            
+            print(f"  Waiting {format_time_delta(delay_hours)} before next request...")
+            print()
+            wait_hours(delay_hours)
+            print(f"  Wait complete. Proceeding to next request...")
+            print()
+            
             request_count += 1
             current_time = datetime.now()
             
@@ -122,95 +259,56 @@ def main():
             print(f"[Request #{request_count}]")
             print(f"  Timestamp: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"  Time since last request: {time_since_last_str}")
-            print(f"  Current delay: {delay_hours} hours")
+            print(f"  Current delay: {format_time_delta(delay_hours)}")
             print_raw_request("GET", URL, headers)
             print("  Sending request...", end=" ", flush=True)
             
-            # Send GET request
+            # Send GET request (transient failures are retried by the session's adapter)
             try:
-                response = requests.get(URL, headers=headers, timeout=REQUEST_TIMEOUT)
-                print(f"Status: {response.status_code}")
-                
-                # Check if session expired (non-200 response)
-                if response.status_code != 200:
-                    print()
-                    print("=" * 80)
-                    print("SESSION TIMEOUT DETECTED")
-                    print("=" * 80)
-                    print()
-                    
-                    # Full HTTP response
-                    print("Full HTTP Response:")
-                    print("-" * 80)
-                    print(f"Status Code: {response.status_code}")
-                    print(f"Status Reason: {response.reason}")
-                    print()
-                    print("Response Headers:")
-                    for key, value in response.headers.items():
-                        print(f"  {key}: {value}")
-                    print()
-                    print("Response Body:")
-                    print("-" * 80)
-                    try:
-                        # Try to decode as JSON first
-                        print(response.json())
-                    except:
-                        # Fall back to text
-                        print(response.text)
-                    print("-" * 80)
-                    print()
-                    
-                    # Summary
-                    total_elapsed = current_time - start_time
-                    total_elapsed_hours = total_elapsed.total_seconds() / 3600
-                    
-                    print("Summary:")
-                    print("-" * 80)
-                    print(f"Total requests made: {request_count}")
-                    print(f"Total time elapsed: {format_time_delta(total_elapsed_hours)}")
-                    print(f"Delay before timeout: {format_time_delta(delay_hours)}")
-                    print(f"Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                    print(f"Timeout detected at: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                    print("=" * 80)
-                    break
-                
+                response = SESSION.get(URL, timeout=REQUEST_TIMEOUT)
             except requests.exceptions.RequestException as e:
                 print(f"ERROR: {e}")
-                print("Retrying in 60 seconds...")
-                time.sleep(60)
-                continue
-            
-            # Update last request time
+                print("  Request failed after retries; stopping the test.")
+                break
+            print(f"Status: {response.status_code}")
             last_request_time = current_time
             
-            # Calculate next delay (cumulative: 0h, 4h, 8h, 12h, 16h, etc.)
-            delay_hours += DELAY_INCREMENT_HOURS
-            delay_seconds = delay_hours * 3600
-            
-            print(f"  Waiting {format_time_delta(delay_hours)} before next request...")
-            print()
-            
-            # Sleep for the delay with progress updates
-            sleep_start = datetime.now()
-            sleep_interval = 3600  # Update every 1 hour (3600 seconds)
-            remaining_seconds = delay_seconds
+            if response.status_code == 200:
+                lo_hours = delay_hours
+                print(f"  ✓ Session survived {format_time_delta(delay_hours)} idle")
+            else:
+                hi_hours = delay_hours
+                print_timeout_response(response)
             
-            while remaining_seconds > 0:
-                # Sleep in chunks to allow progress updates
-                sleep_chunk = min(sleep_interval, remaining_seconds)
-                time.sleep(sleep_chunk)
-                remaining_seconds -= sleep_chunk
-                
-                # Show progress every hour
-                if remaining_seconds > 0:
-                    elapsed = (datetime.now() - sleep_start).total_seconds()
-                    elapsed_hours = elapsed / 3600
-                    remaining_hours = remaining_seconds / 3600
-                    print(f"  [Progress] Elapsed: {format_time_delta(elapsed_hours)}, "
-                          f"Remaining: {format_time_delta(remaining_hours)}", flush=True)
+            if hi_hours is not None:
+                print(f"  Timeout is between {format_time_delta(lo_hours)} and {format_time_delta(hi_hours)}")
+                if hi_hours - lo_hours < TOLERANCE_HOURS:
+                    break
             
-            print(f"  Wait complete. Proceeding to next request...")
+            if response.status_code != 200:
+                # The session is gone; a fresh cookie is needed for the next probe
+                new_cookie = input("  Enter a fresh respondent.session.sid value to continue (blank to stop): ").strip()
+                if not new_cookie:
+                    break
+                headers["Cookie"] = f"respondent.session.sid={new_cookie}"
+                SESSION.headers["Cookie"] = headers["Cookie"]
             print()
+        
+        # Summary
+        total_elapsed = datetime.now() - start_time
+        total_elapsed_hours = total_elapsed.total_seconds() / 3600
+        
+        print()
+        print("Summary:")
+        print("-" * 80)
+        print(f"Total requests made: {request_count}")
+        print(f"Total time elapsed: {format_time_delta(total_elapsed_hours)}")
+        if hi_hours is not None:
+            print(f"Session timeout: between {format_time_delta(lo_hours)} and {format_time_delta(hi_hours)} idle")
+        else:
+            print(f"Session survived every probe (longest idle: {format_time_delta(lo_hours)})")
+        print(f"Start time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 80)
             
     except KeyboardInterrupt:
         print()
@@ -222,9 +320,134 @@ def main():
             total_elapsed_hours = total_elapsed.total_seconds() / 3600
             print(f"Total requests made: {request_count}")
             print(f"Total time elapsed: {format_time_delta(total_elapsed_hours)}")
-            print(f"Last delay was: {format_time_delta(delay_hours)}")
+            print(f"Longest delay survived: {format_time_delta(lo_hours)}")
+            if hi_hours is not None:
+                print(f"Shortest delay that expired: {format_time_delta(hi_hours)}")
         print("=" * 80)
 
 
+def log(label, message):
+    """Print one line for a parallel probe, prefixed with its label."""
+    with _print_lock:
+        print(f"[{label}] {message}", flush=True)
+
+
+def probe_cookie(label, cookie_value, bounds):
+    """
+    Probe one session cookie until its first expiry (or _stop_event), without prompting.
+    
+    Args:
+        label: Name used to prefix this probe's output
+        cookie_value: respondent.session.sid value to probe
+        bounds: Shared dict; bounds[label] is kept up to date with
+            (longest delay survived, shortest delay that expired or None)
+            so partial results can be reported after Ctrl-C
+    
+    Returns:
+        tuple: (label, longest delay survived, shortest delay that expired or None)
+    """
+    session = create_session(cookie_value)
+    lo_hours = 0
+    hi_hours = None
+    bounds[label] = (lo_hours, hi_hours)
+    
+    try:
+        response = session.get(URL, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        log(label, f"Baseline request failed: {e}")
+        return label, lo_hours, hi_hours
+    if response.status_code != 200:
+        log(label, f"Baseline request failed: {response.status_code} {response.reason}")
+        return label, lo_hours, hi_hours
+    log(label, "Session is valid. Starting timeout test...")
+    
+    while hi_hours is None:
+        delay_hours = next_delay(lo_hours, hi_hours)
+        log(label, f"Waiting {format_time_delta(delay_hours)} before next request...")
+        if not wait_hours(delay_hours, label):
+            log(label, "Interrupted; stopping this probe.")
+            break
+        
+        try:
+            response = session.get(URL, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            log(label, f"ERROR: {e}. Request failed after retries; stopping this probe.")
+            break
+        
+        log(label, f"Status after {format_time_delta(delay_hours)} idle: {response.status_code}")
+        if response.status_code == 200:
+            lo_hours = delay_hours
+        else:
+            hi_hours = delay_hours
+        bounds[label] = (lo_hours, hi_hours)
+    
+    return label, lo_hours, hi_hours
+
+
+def probe_cookies(cookie_file):
+    """Probe every session cookie listed in cookie_file in parallel."""
+    with open(cookie_file) as f:
+        cookie_values = [line.strip() for line in f if line.strip()]
+    if not cookie_values:
+        print(f"No cookies found in {cookie_file}")
+        return
+    
+    print("=" * 80)
+    print("Session Timeout Test Script")
+    print("=" * 80)
+    print(f"Target URL: {URL}")
+    print(f"Probing {len(cookie_values)} cookies in parallel")
+    print("=" * 80)
+    print()
+    
+    labels = [f"Cookie #{i}" for i in range(1, len(cookie_values) + 1)]
+    bounds = {}
+    interrupted = False
+    
+    # Probes spend nearly all their time asleep, so one thread per cookie is cheap
+    executor = ThreadPoolExecutor(max_workers=len(cookie_values))
+    futures = [
+        executor.submit(probe_cookie, label, cookie_value, bounds)
+        for label, cookie_value in zip(labels, cookie_values)
+    ]
+    try:
+        # Wait in short slices so Ctrl-C reaches the main thread promptly
+        while wait(futures, timeout=1).not_done:
+            pass
+        executor.shutdown()
+        for future in futures:
+            future.result()  # Re-raise anything a probe raised
+    except KeyboardInterrupt:
+        interrupted = True
+        # Wake the probes out of their waits, drop anything not yet started,
+        # and don't block on probes finishing an in-flight request
+        _stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    print()
+    print("Summary (interrupted; partial bounds):" if interrupted else "Summary:")
+    print("-" * 80)
+    for label in labels:
+        if label not in bounds:
+            print(f"{label:12} not started")
+            continue
+        lo_hours, hi_hours = bounds[label]
+        if hi_hours is None:
+            print(f"{label:12} no expiry observed (longest idle: {format_time_delta(lo_hours)})")
+        else:
+            print(f"{label:12} timeout between {format_time_delta(lo_hours)} and {format_time_delta(hi_hours)} idle")
+    print("=" * 80)
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Find the Respondent.io session idle timeout")
+    parser.add_argument(
+        "--cookies",
+        help="File with one respondent.session.sid value per line to probe in parallel"
+    )
+    args = parser.parse_args()
+    
+    if args.cookies:
+        probe_cookies(args.cookies)
+    else:
+        main()
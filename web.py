@@ -3,11 +3,10 @@
 Entry point for Respondent.io Web UI
 """
 import os
-from pathlib import Path
-from dotenv import load_dotenv
+from web.env_utils import load_env
 
 # Load environment variables from .env file in project root
-load_dotenv(Path(__file__).parent / '.env')
+load_env()
 
 from web.app import app
 
@@ -5,28 +5,227 @@ Module for AI analysis using Grok API
 
 import os
 import json
+import logging
 import base64
+import re
+import hashlib
 import requests
-from typing import Dict, Any, List, Optional
-from dotenv import load_dotenv
-from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, Any, List, Optional
+
+# Import environment, JSON and HTTP helpers
+try:
+    from .env_utils import load_env
+    from .json_utils import loads as json_loads
+    from .http_utils import CappedRetry
+except ImportError:
+    from env_utils import load_env
+    from json_utils import loads as json_loads
+    from http_utils import CappedRetry
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
 
 # Load environment variables
-PROJECT_ROOT = Path(__file__).parent.parent
-load_dotenv(PROJECT_ROOT / '.env')
+load_env()
 
 GROK_API_KEY = os.environ.get('GROK_API_KEY')
 GROK_API_URL = os.environ.get('GROK_API_URL', 'https://api.x.ai/v1/chat/completions')
 
+# Maximum number of Grok requests in flight at once (keep below the xAI rate limit)
+GROK_CONCURRENCY = int(os.environ.get('GROK_CONCURRENCY', '16'))
+
+# Retries for rate limiting (429) and temporary unavailability (503), with exponential backoff
+GROK_MAX_RETRIES = int(os.environ.get('GROK_MAX_RETRIES', '5'))
+GROK_RETRY_BACKOFF_FACTOR = float(os.environ.get('GROK_RETRY_BACKOFF', '0.5'))
+
+# Shared session so Grok calls reuse pooled keep-alive connections; the pool is
+# sized for GROK_CONCURRENCY parallel requests. Chat completions are not
+# idempotent, so POST is only retried when Grok did no work: on connection
+# errors and on 429/503 rejections, honoring Retry-After for at most
+# RETRY_AFTER_MAX_SECONDS (these calls run inside web requests). Read timeouts
+# and 500/502/504 are not retried: the request may have reached the model and
+# would otherwise be re-sent (and billed) up to GROK_MAX_RETRIES more times.
+# The last response is returned rather than raised so the usual error logging runs.
+_grok_session = requests.Session()
+_grok_session.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=GROK_CONCURRENCY,
+    max_retries=CappedRetry(
+        total=GROK_MAX_RETRIES,
+        read=0,
+        backoff_factor=GROK_RETRY_BACKOFF_FACTOR,
+        status_forcelist=[429, 503],
+        allowed_methods=frozenset(['POST']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+))
+
+# Matches a reply wrapped in a Markdown code fence (```json ... ``` or ``` ... ```)
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.S)
+
+# Metadata fields extracted by Grok; each is a list of strings
+METADATA_FIELDS = ('regions', 'professions', 'industries')
+
+# How long identical Grok requests are answered from the Firestore response cache (default: 7 days)
+GROK_CACHE_TTL_SECONDS = int(os.environ.get('GROK_CACHE_TTL', str(7 * 24 * 3600)))
+
+
+def _grok_cache_collection():
+    """Return the Firestore collection for cached Grok responses, or None if unavailable"""
+    try:
+        from .db import grok_response_cache_collection
+    except ImportError:
+        try:
+            from db import grok_response_cache_collection
+        except ImportError:
+            return None
+    return grok_response_cache_collection
+
+
+def _grok_cache_key(prompt: str, system_prompt: Optional[str], model: str) -> str:
+    """Hash the model and prompts into a Firestore document ID"""
+    material = f"{model}\x00{system_prompt or ''}\x00{prompt}".encode('utf-8')
+    return hashlib.blake2b(material, digest_size=16).hexdigest()
+
+
+def _grok_cache_get(key: str) -> Optional[str]:
+    """
+    Look up a cached Grok response
+    
+    Args:
+        key: Cache key from _grok_cache_key()
+        
+    Returns:
+        Cached response text, or None on a miss, expiry or error
+    """
+    collection = _grok_cache_collection()
+    if collection is None:
+        return None
+    try:
+        doc = collection.document(key).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        expires_at = data.get('expires_at')
+        if not expires_at or expires_at <= datetime.now(timezone.utc):
+            return None
+        return data.get('response')
+    except Exception as e:
+        logger.warning("[Grok Cache] Error reading cache: %s", e)
+        return None
+
+
+def _grok_cache_set(key: str, response_text: str, model: str):
+    """
+    Store a Grok response in the cache for GROK_CACHE_TTL_SECONDS
+    
+    Args:
+        key: Cache key from _grok_cache_key()
+        response_text: Response text to cache
+        model: Model that produced the response
+    """
+    collection = _grok_cache_collection()
+    if collection is None:
+        return
+    try:
+        now = datetime.now(timezone.utc)
+        collection.document(key).set({
+            'response': response_text,
+            'model': model,
+            'cached_at': now,
+            'expires_at': now + timedelta(seconds=GROK_CACHE_TTL_SECONDS)
+        })
+    except Exception as e:
+        logger.warning("[Grok Cache] Error writing cache: %s", e)
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace so formatting-only differences share a cached Grok response"""
+    return ' '.join((text or '').split())
+
+
+def _strip_code_fences(response: str) -> str:
+    """Strip surrounding whitespace and a ```json ... ``` fence from a Grok response"""
+    match = _FENCE_RE.match(response)
+    return match.group(1) if match else response.strip()
+
+
+def _parse_fenced_json(response: str) -> Any:
+    """
+    Parse the JSON in a Grok response, with or without a Markdown code fence
+    
+    Args:
+        response: Raw response text
+        
+    Returns:
+        Parsed JSON value
+        
+    Raises:
+        json.JSONDecodeError: If the payload is not valid JSON
+    """
+    return json_loads(_strip_code_fences(response))
+
+
+def _json_response_is(response: str, check: Callable[[Any], Any]) -> bool:
+    """
+    Check that a Grok response parses as JSON and that check() accepts the value
+    
+    Used to build the validate callbacks passed to _call_grok_api, so only
+    responses the caller can use are cached.
+    """
+    try:
+        return bool(check(_parse_fenced_json(response)))
+    except Exception:
+        return False
+
+
+def _validate_metadata(metadata: Any) -> Optional[Dict[str, List[str]]]:
+    """
+    Validate extracted metadata parsed from a Grok response
+    
+    Args:
+        metadata: Parsed JSON value for one project
+        
+    Returns:
+        Dictionary with METADATA_FIELDS lists of strings (missing fields become
+        empty lists), or None if the value doesn't have that shape
+    """
+    if not isinstance(metadata, dict):
+        return None
+    validated = {}
+    for field in METADATA_FIELDS:
+        values = metadata.get(field, [])
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            return None
+        validated[field] = values
+    return validated
+
 
-def _call_grok_api(prompt: str, system_prompt: Optional[str] = None, model: str = 'grok-4-1-fast-reasoning') -> Optional[str]:
+def _call_grok_api(
+    prompt: str,
+    system_prompt: Optional[str] = None,
+    model: str = 'grok-4-1-fast-reasoning',
+    use_cache: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
+) -> Optional[str]:
     """
     Make a call to Grok API
     
+    Identical requests (same model and prompts) are answered from the Firestore
+    response cache for GROK_CACHE_TTL_SECONDS. A response is only cached once
+    validate() accepts it, so prose, truncated or malformed replies are asked
+    again next time instead of being served for the whole TTL.
+    
     Args:
         prompt: User prompt
         system_prompt: Optional system prompt
         model: Grok model to use (default: 'grok-4-1-fast-reasoning')
+        use_cache: Whether to read and write the response cache (default: True)
+        validate: Called with the response text; returns True if the caller can
+            use it. Without a validator, responses are not cached.
         
     Returns:
         Response text or None if error
@@ -35,6 +234,16 @@ def _call_grok_api(prompt: str, system_prompt: Optional[str] = None, model: str
         print("Warning: GROK_API_KEY not set, skipping AI analysis")
         return None
     
+    cache_key = (
+        _grok_cache_key(prompt, system_prompt, model)
+        if use_cache and validate is not None and GROK_CACHE_TTL_SECONDS > 0 else None
+    )
+    if cache_key:
+        cached = _grok_cache_get(cache_key)
+        if cached is not None:
+            logger.debug("[Grok API] Cache hit (model: %s)", model)
+            return cached
+    
     try:
         headers = {
             'Authorization': f'Bearer {GROK_API_KEY}',
@@ -54,40 +263,41 @@ def _call_grok_api(prompt: str, system_prompt: Optional[str] = None, model: str
             'temperature': 0.3
         }
         
-        print(f"[Grok API] POST {GROK_API_URL}")
-        print(f"[Grok API] Model: {model}, Messages: {len(messages)}")
+        logger.debug("[Grok API] POST %s (model: %s, messages: %d)", GROK_API_URL, model, len(messages))
         
-        response = requests.post(GROK_API_URL, headers=headers, json=payload, timeout=30)
+        response = _grok_session.post(GROK_API_URL, headers=headers, json=payload, timeout=30)
         
-        # Log response details for debugging
-        print(f"[Grok API] Response status: {response.status_code}")
+        logger.debug("[Grok API] Response status: %s", response.status_code)
         if not response.ok:
-            error_text = response.text[:500] if response.text else "No response body"
-            print(f"[Grok API] Error response: {error_text}")
-            print(f"[Grok API] Full URL: {GROK_API_URL}")
-            print(f"[Grok API] Request payload keys: {list(payload.keys())}")
+            logger.error(
+                "[Grok API] HTTP %s from %s (model: %s): %s",
+                response.status_code, GROK_API_URL, model,
+                response.text[:500] if response.text else "No response body"
+            )
             
             # If 404, suggest checking the endpoint URL
-            if response.status_code == 404:
-                print("[Grok API] 404 Error - Possible issues:")
-                print("  - Check if the API endpoint URL is correct")
-                print("  - Verify the model name is correct (try: grok-beta, grok-2, grok)")
-                print("  - Check xAI API documentation for the correct endpoint")
-                print("  - Ensure your API key has access to the Grok API")
-        
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('choices', [{}])[0].get('message', {}).get('content', '')
-    except requests.exceptions.HTTPError as e:
-        error_msg = f"HTTP Error {e.response.status_code if e.response else 'unknown'}: {e.response.text[:500] if e.response else str(e)}"
-        print(f"[Grok API] Error: {error_msg}")
-        print(f"[Grok API] URL: {GROK_API_URL}")
-        print(f"[Grok API] Model: {payload.get('model', 'unknown')}")
-        return None
+            if response.status_code == 404 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[Grok API] 404 Error - Possible issues:\n"
+                    "  - Check if the API endpoint URL is correct\n"
+                    "  - Verify the model name is correct (try: grok-beta, grok-2, grok)\n"
+                    "  - Check xAI API documentation for the correct endpoint\n"
+                    "  - Ensure your API key has access to the Grok API"
+                )
+            return None
+        
+        # Decode the body once, straight from bytes
+        data = json_loads(response.content)
+        try:
+            content = data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            logger.warning("[Grok API] Unexpected response shape: %.500s", data)
+            content = ''
+        if cache_key and content and validate(content):
+            _grok_cache_set(cache_key, content, model)
+        return content
     except Exception as e:
-        print(f"[Grok API] Error calling Grok API: {e}")
-        print(f"[Grok API] URL: {GROK_API_URL}")
+        logger.error("[Grok API] Error calling Grok API at %s: %s", GROK_API_URL, e)
         return None
 
 
@@ -118,6 +328,9 @@ def extract_metadata_with_grok(description: str, name: str) -> Dict[str, Any]:
     Returns:
         Dictionary with extracted metadata
     """
+    name = _normalize_text(name)
+    description = _normalize_text(description)
+    
     prompt = f"""Analyze the following project and extract key information. Return ONLY a valid JSON object with no additional text.
 
 Project Name: {name}
@@ -135,27 +348,19 @@ Return format:
   "industries": ["industry1", "industry2"]
 }}"""
 
-    response = _call_grok_api(prompt)
+    response = _call_grok_api(
+        prompt,
+        validate=lambda text: _json_response_is(text, lambda value: _validate_metadata(value) is not None)
+    )
     if not response:
         return {'regions': [], 'professions': [], 'industries': []}
     
     try:
         # Try to extract JSON from response
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-        
-        metadata = json.loads(response)
-        return {
-            'regions': metadata.get('regions', []),
-            'professions': metadata.get('professions', []),
-            'industries': metadata.get('industries', [])
-        }
+        metadata = _validate_metadata(_parse_fenced_json(response))
+        if metadata is None:
+            raise ValueError("Unexpected metadata shape")
+        return metadata
     except Exception as e:
         print(f"Error parsing Grok response: {e}")
         return {'regions': [], 'professions': [], 'industries': []}
@@ -190,8 +395,9 @@ def analyze_hide_feedback(feedback_text: str, project_data: Dict[str, Any]) -> D
     Returns:
         Dictionary with extracted reasons and patterns
     """
-    name = project_data.get('name', '')
-    description = project_data.get('description', '')
+    feedback_text = _normalize_text(feedback_text)
+    name = _normalize_text(project_data.get('name', ''))
+    description = _normalize_text(project_data.get('description', ''))
     
     prompt = f"""A user hid a project and provided this feedback: "{feedback_text}"
 
@@ -213,21 +419,12 @@ Return ONLY a valid JSON object:
   }}
 }}"""
 
-    response = _call_grok_api(prompt)
+    response = _call_grok_api(prompt, validate=lambda text: _json_response_is(text, lambda value: isinstance(value, dict)))
     if not response:
         return {'reasons': [], 'patterns': {}}
     
     try:
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-        
-        result = json.loads(response)
+        result = _parse_fenced_json(response)
         return {
             'reasons': result.get('reasons', []),
             'patterns': result.get('patterns', {})
@@ -252,6 +449,51 @@ def extract_similarity_patterns(feedback_text: str, project_data: Dict[str, Any]
     return analysis.get('patterns', {})
 
 
+def _keyword_pattern(keywords: List[str]) -> Optional[re.Pattern]:
+    """
+    Compile keywords into one case-insensitive substring matcher
+    
+    A single alternation scans each project's text once instead of once per keyword.
+    
+    Args:
+        keywords: Keywords to look for
+        
+    Returns:
+        Compiled pattern, or None if there are no keywords
+    """
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+
+
+def _project_text(project: Dict[str, Any]) -> str:
+    """Lowercased "name description" text that keyword patterns are matched against"""
+    return f"{project.get('name', '').lower()} {project.get('description', '').lower()}"
+
+
+def _lowercase_metadata(metadata: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Lowercase the regions/professions/industries lists of extracted metadata"""
+    return {
+        field: [value.lower() for value in metadata.get(field, []) if isinstance(value, str)]
+        for field in METADATA_FIELDS
+    }
+
+
+def _metadata_matches(metadata_values: List[str], pattern_values: frozenset) -> bool:
+    """
+    Check whether any pattern value occurs in a lowercased metadata list
+    
+    Exact values are found with a set intersection; otherwise a pattern value may
+    still match as a substring of a metadata value (e.g. "york" in "new york").
+    """
+    if not metadata_values:
+        return False
+    if not pattern_values.isdisjoint(metadata_values):
+        return True
+    joined = "\n".join(metadata_values)
+    return any(value in joined for value in pattern_values)
+
+
 def find_similar_projects(
     user_id: str,
     project_id: str,
@@ -271,29 +513,31 @@ def find_similar_projects(
         List of similar projects
     """
     similar = []
-    keywords = similarity_patterns.get('keywords', [])
-    regions = similarity_patterns.get('regions', [])
-    professions = similarity_patterns.get('professions', [])
-    industries = similarity_patterns.get('industries', [])
+    # Lowercase the patterns once rather than once per project
+    keyword_pattern = _keyword_pattern(similarity_patterns.get('keywords', []))
+    # Metadata fields with fewer pattern values are cheaper to check, so try them first
+    field_patterns = sorted(
+        (
+            (field, frozenset(value.lower() for value in similarity_patterns.get(field, [])))
+            for field in ('regions', 'industries', 'professions')
+        ),
+        key=lambda item: len(item[1])
+    )
+    field_patterns = [(field, values) for field, values in field_patterns if values]
     
     for project in all_projects:
         if project.get('id') == project_id:
             continue
         
-        name = project.get('name', '').lower()
-        description = project.get('description', '').lower()
-        text = f"{name} {description}"
-        
-        # Check for keyword matches
-        matches_keywords = any(keyword.lower() in text for keyword in keywords) if keywords else False
-        
         # Check extracted metadata
-        metadata = project.get('extracted_metadata', {})
-        matches_regions = any(region.lower() in str(metadata.get('regions', [])).lower() for region in regions) if regions else False
-        matches_professions = any(prof.lower() in str(metadata.get('professions', [])).lower() for prof in professions) if professions else False
-        matches_industries = any(ind.lower() in str(metadata.get('industries', [])).lower() for ind in industries) if industries else False
-        
-        if matches_keywords or matches_regions or matches_professions or matches_industries:
+        if field_patterns:
+            metadata_lower = _lowercase_metadata(project.get('extracted_metadata', {}))
+            if any(_metadata_matches(metadata_lower.get(field, []), values) for field, values in field_patterns):
+                similar.append(project)
+                continue
+        
+        # Check for keyword matches (scans the full text, so it goes last)
+        if keyword_pattern and keyword_pattern.search(_project_text(project)):
             similar.append(project)
     
     return similar
@@ -348,21 +592,18 @@ Return ONLY a valid JSON array of category recommendations:
 
 Return 5-10 relevant categories."""
 
-    response = _call_grok_api(prompt)
+    response = _call_grok_api(
+        prompt,
+        validate=lambda text: _json_response_is(
+            text,
+            lambda value: isinstance(value, dict) or (isinstance(value, list) and all(isinstance(rec, dict) for rec in value))
+        )
+    )
     if not response:
         return []
     
     try:
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-        
-        recommendations = json.loads(response)
+        recommendations = _parse_fenced_json(response)
         if not isinstance(recommendations, list):
             recommendations = [recommendations]
         
@@ -436,16 +677,10 @@ def validate_category_pattern(category_pattern: Dict[str, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not isinstance(category_pattern, dict):
-        return False
-    
-    # Check for required fields (at least one should be present)
-    has_keywords = bool(category_pattern.get('keywords'))
-    has_regions = bool(category_pattern.get('regions'))
-    has_professions = bool(category_pattern.get('professions'))
-    has_industries = bool(category_pattern.get('industries'))
-    
-    return has_keywords or has_regions or has_professions or has_industries
+    # At least one of the pattern fields must be present and non-empty
+    return isinstance(category_pattern, dict) and any(
+        category_pattern.get(field) for field in ('keywords', 'regions', 'professions', 'industries')
+    )
 
 
 def generate_hide_suggestions(project_data: Dict[str, Any]) -> List[str]:
@@ -479,7 +714,11 @@ Return ONLY a valid JSON array of exactly 3 short, precise suggestion strings, n
 
 Make each suggestion specific to this project, written in first person, short and precise (5-10 words max), expressing the user's personal reasons for hiding it based on the project content."""
 
-    response = _call_grok_api(prompt, model='grok-4-1-fast-non-reasoning')
+    response = _call_grok_api(
+        prompt,
+        model='grok-4-1-fast-non-reasoning',
+        validate=lambda text: _json_response_is(text, lambda value: isinstance(value, list) and len(value) > 0)
+    )
     if not response:
         # Fallback suggestions if AI fails
         return [
@@ -490,16 +729,7 @@ Make each suggestion specific to this project, written in first person, short an
     
     try:
         # Try to extract JSON from response
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
-        
-        suggestions = json.loads(response)
+        suggestions = _parse_fenced_json(response)
         if isinstance(suggestions, list) and len(suggestions) > 0:
             # Ensure we have exactly 3 suggestions
             if len(suggestions) >= 3:
@@ -567,7 +797,11 @@ then projects about law firms should be hidden.
 
 Return ONLY "true" or "false" (lowercase, no quotes, no additional text)."""
 
-    response = _call_grok_api(prompt, model='grok-4-1-fast-non-reasoning')
+    response = _call_grok_api(
+        prompt,
+        model='grok-4-1-fast-non-reasoning',
+        validate=lambda text: text.strip().lower().strip('"\'') in ('true', 'false')
+    )
     if not response:
         return False
     
@@ -589,6 +823,17 @@ Return ONLY "true" or "false" (lowercase, no quotes, no additional text)."""
         return False
 
 
+def _is_question_response(response: str) -> bool:
+    """Check a question-generation reply: an explicit "no question" or a question with a pattern"""
+    stripped = _strip_code_fences(response)
+    if stripped.lower() in ('null', 'none', '{}'):
+        return True
+    return _json_response_is(
+        stripped,
+        lambda value: isinstance(value, dict) and value.get('question_text') and value.get('pattern')
+    )
+
+
 def generate_question_from_project(project_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Generate a contextual question from a project to learn user preferences
@@ -631,26 +876,19 @@ Return ONLY a valid JSON object with no additional text:
 Question types can be: "profession", "region", "industry", or "other"
 If no clear pattern is detected, return null or an empty object."""
 
-    response = _call_grok_api(prompt)
+    response = _call_grok_api(prompt, validate=_is_question_response)
     if not response:
         return None
     
     try:
         # Try to extract JSON from response
-        response = response.strip()
-        if response.startswith('```json'):
-            response = response[7:]
-        if response.startswith('```'):
-            response = response[3:]
-        if response.endswith('```'):
-            response = response[:-3]
-        response = response.strip()
+        response = _strip_code_fences(response)
         
         # Check for null or empty responses
         if not response or response.lower() in ('null', 'none', '{}'):
             return None
         
-        question_data = json.loads(response)
+        question_data = json_loads(response)
         
         # Validate that we have required fields
         if not question_data.get('question_text') or not question_data.get('pattern'):
@@ -4,146 +4,120 @@ Flask web UI for Respondent.io API management with passkey authentication
 """
 
 import os
+import socket
 import secrets
 import time
-import requests
+import threading
 from pathlib import Path
-from flask import Flask, jsonify, send_from_directory, render_template
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from flask import Flask, jsonify, request, send_from_directory, render_template
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime, timezone, timedelta
-from dotenv import load_dotenv
 
-# Import database collections
+# Import environment and JSON helpers
 try:
-    from .db import (
-        users_collection, session_keys_collection, projects_cache_collection,
-        user_preferences_collection, hidden_projects_log_collection,
-        hide_feedback_collection, category_recommendations_collection,
-        user_profiles_collection, firestore_available, db
-    )
-except ImportError:
-    from db import (
-        users_collection, session_keys_collection, projects_cache_collection,
-        user_preferences_collection, hidden_projects_log_collection,
-        hide_feedback_collection, category_recommendations_collection,
-        user_profiles_collection, firestore_available, db
-    )
-
-# Import user service
-try:
-    from .services.user_service import (
-        create_user,
-        load_credentials_by_user_id,
-        load_user_config, save_user_config, update_last_synced,
-        load_user_filters, save_user_filters
-    )
-except ImportError:
-    from services.user_service import (
-        create_user,
-        load_credentials_by_user_id,
-        load_user_config, save_user_config, update_last_synced,
-        load_user_filters, save_user_filters
-    )
-
-# Import respondent auth service
-try:
-    from .services.respondent_auth_service import (
-        create_respondent_session, verify_respondent_authentication,
-        fetch_and_store_user_profile, get_user_profile, fetch_user_profile,
-        extract_demographic_params
-    )
-except ImportError:
-    from services.respondent_auth_service import (
-        create_respondent_session, verify_respondent_authentication,
-        fetch_and_store_user_profile, get_user_profile, fetch_user_profile,
-        extract_demographic_params
-    )
-
-# Import project service
-try:
-    from .services.project_service import (
-        fetch_respondent_projects, fetch_all_respondent_projects,
-        hide_project_via_api, get_hidden_count, process_and_hide_projects,
-        get_hide_progress, hide_progress
-    )
+    from .env_utils import load_env
+    from .json_utils import orjson, loads as json_loads
 except ImportError:
-    from services.project_service import (
-        fetch_respondent_projects, fetch_all_respondent_projects,
-        hide_project_via_api, get_hidden_count, process_and_hide_projects,
-        get_hide_progress, hide_progress
-    )
+    from env_utils import load_env
+    from json_utils import orjson, loads as json_loads
 
-# Import filter service
+# SMTP settings for the health check, resolved once (None if the email service
+# can't be imported)
 try:
-    from .services.filter_service import (
-        apply_filters_to_projects, should_hide_project
-    )
+    from .services.email_service import get_smtp_config as _get_smtp_config
 except ImportError:
-    from services.filter_service import (
-        apply_filters_to_projects, should_hide_project
-    )
+    try:
+        from services.email_service import get_smtp_config as _get_smtp_config
+    except ImportError:
+        _get_smtp_config = None
 
-# Import new modules
-try:
-    from .cache_manager import is_cache_fresh, get_cached_projects, refresh_project_cache, get_cache_stats, mark_projects_hidden_in_cache
-    from .hidden_projects_tracker import (
-        log_hidden_project, get_hidden_projects_count, get_hidden_projects_timeline,
-        get_hidden_projects_stats, is_project_hidden
-    )
-    from .ai_analyzer import (
-        analyze_project, analyze_projects_batch, extract_metadata_with_grok,
-        analyze_hide_feedback, find_similar_projects, generate_category_recommendations,
-        get_projects_in_category, validate_category_pattern
-    )
-    from .preference_learner import (
-        record_project_hidden, record_category_hidden, record_project_kept,
-        analyze_feedback_and_learn, get_user_preferences, should_hide_project,
-        find_and_auto_hide_similar
-    )
-except ImportError:
-    from cache_manager import is_cache_fresh, get_cached_projects, refresh_project_cache, get_cache_stats, mark_projects_hidden_in_cache
-    from hidden_projects_tracker import (
-        log_hidden_project, get_hidden_projects_count, get_hidden_projects_timeline,
-        get_hidden_projects_stats, is_project_hidden
-    )
-    from ai_analyzer import (
-        analyze_project, analyze_projects_batch, extract_metadata_with_grok,
-        analyze_hide_feedback, find_similar_projects, generate_category_recommendations,
-        get_projects_in_category, validate_category_pattern
-    )
-    from preference_learner import (
-        record_project_hidden, record_category_hidden, record_project_kept,
-        analyze_feedback_and_learn, get_user_preferences, should_hide_project,
-        find_and_auto_hide_similar
-    )
+# Other services, the AI analyzer and the preference learner are imported by the
+# route blueprints that use them (registered below); the health check imports the
+# database module on demand.
 
 # Get the directory where this file is located
 BASE_DIR = Path(__file__).parent
 PROJECT_ROOT = BASE_DIR.parent
 
 # Load environment variables from .env file
-load_dotenv(PROJECT_ROOT / '.env')
+load_env()
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes responses with orjson when it is installed
+    
+    Output matches the default provider: keys are sorted when sort_keys is set, and
+    datetimes and other non-native types still go through DefaultJSONProvider.default
+    (so dates keep Flask's HTTP date format).
+    """
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64 bits; the standard library handles these
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
 
 app = Flask(__name__, 
             template_folder=str(BASE_DIR / 'templates'),
             static_folder=str(BASE_DIR / 'static'),
             static_url_path='/static')
 app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(32))
+app.json = OrjsonJSONProvider(app)
 
 # Configure sessions to last as long as possible (10 years)
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=3650)
 
+# Grok API settings reported by /health, read once at start-up; the host and port
+# probed are parsed from GROK_API_URL
+GROK_API_KEY_CONFIGURED = bool(os.environ.get('GROK_API_KEY'))
+GROK_API_URL = os.environ.get('GROK_API_URL', 'https://api.x.ai/v1/chat/completions')
+_grok_url = urlparse(GROK_API_URL)
+GROK_HEALTH_ADDRESS = (_grok_url.hostname, _grok_url.port or (443 if _grok_url.scheme == 'https' else 80))
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """
-    Health check endpoint that reports status of database, Grok API, SMTP, and application.
-    Returns 200 if all services are healthy, 503 if any critical service is down.
+# Resolved socket addresses by (host, port) as (address, expires_at), so health
+# probes don't repeat the DNS lookup every time
+DNS_CACHE_TTL_SECONDS = 60
+_dns_cache = {}
+
+
+def _resolve_cached(host, port):
     """
-    overall_status = "healthy"
-    http_status = 200
-    services = {}
+    Resolve host and port to a TCP socket address, reusing results for DNS_CACHE_TTL_SECONDS
     
-    # Database health check
+    Args:
+        host: Hostname
+        port: Port number
+        
+    Returns:
+        tuple: Socket address suitable for socket.create_connection
+        
+    Raises:
+        OSError: If the name can't be resolved
+    """
+    cached = _dns_cache.get((host, port))
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+    address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][:2]
+    _dns_cache[(host, port)] = (address, time.monotonic() + DNS_CACHE_TTL_SECONDS)
+    return address
+
+
+def _probe_database():
+    """Check Firestore connectivity for /health"""
     db_status = "healthy"
     db_available = False
     db_response_time_ms = None
@@ -153,74 +127,54 @@ def health_check():
         from .db import firestore_available, db
         if firestore_available and db is not None:
             start_time = time.time()
-            # Perform a lightweight operation to test connection
-            list(db.collection('users').limit(1).stream())
+            # Perform a lightweight operation to test connection (ID-only projection,
+            # stop after the first document)
+            next(db.collection('users').select([]).limit(1).stream(), None)
             db_response_time_ms = round((time.time() - start_time) * 1000, 2)
             db_available = True
         else:
             db_status = "unhealthy"
             db_error = "Firestore connection not available"
-            overall_status = "unhealthy"
-            http_status = 503
     except Exception as e:
         db_status = "unhealthy"
         db_available = False
         db_error = str(e)
-        overall_status = "unhealthy"
-        http_status = 503
     
-    services['database'] = {
+    return {
         'status': db_status,
         'available': db_available,
         'response_time_ms': db_response_time_ms,
         'error': db_error
     }
-    
-    # Grok API health check
+
+
+def _probe_grok():
+    """Check Grok API configuration and reachability for /health"""
     grok_status = "healthy"
     grok_api_key_configured = False
     grok_reachable = False
     grok_error = None
     
     try:
-        grok_api_key = os.environ.get('GROK_API_KEY')
-        grok_api_url = os.environ.get('GROK_API_URL', 'https://api.x.ai/v1/chat/completions')
-        
-        if grok_api_key:
+        if GROK_API_KEY_CONFIGURED:
             grok_api_key_configured = True
             
             # Perform a lightweight connectivity test with timeout
-            # Test if we can reach the API domain (not making a full API call)
+            # Test if we can reach the API host (a TCP connect, no TLS or HTTP request)
             try:
-                from urllib.parse import urlparse
-                parsed_url = urlparse(grok_api_url)
-                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                
-                # Make a simple HEAD request to check connectivity
-                test_response = requests.head(
-                    base_url,
-                    timeout=2,
-                    allow_redirects=True
-                )
-                # If we get any response (even 404/403), the service is reachable
+                sock = socket.create_connection(_resolve_cached(*GROK_HEALTH_ADDRESS), timeout=2)
+                sock.close()
                 grok_reachable = True
-            except requests.exceptions.Timeout:
+            except socket.timeout:
                 grok_error = "Connection timeout"
                 grok_status = "degraded"
                 grok_reachable = False
-            except requests.exceptions.ConnectionError:
+            except OSError:
+                # Resolve again next time in case the address changed
+                _dns_cache.pop(GROK_HEALTH_ADDRESS, None)
                 grok_error = "Connection error - API unreachable"
                 grok_status = "degraded"
                 grok_reachable = False
-            except Exception as e:
-                # For other errors, assume reachable if we got past connection
-                # (e.g., 403/404 means service is up but endpoint/auth issue)
-                if "timeout" in str(e).lower() or "connection" in str(e).lower():
-                    grok_reachable = False
-                    grok_error = str(e)
-                    grok_status = "degraded"
-                else:
-                    grok_reachable = True
         else:
             grok_error = "GROK_API_KEY not configured"
             grok_status = "degraded"
@@ -230,34 +184,28 @@ def health_check():
         grok_status = "degraded"
         # Grok is optional, so don't mark overall as unhealthy
     
-    services['grok'] = {
+    return {
         'status': grok_status,
         'api_key_configured': grok_api_key_configured,
         'reachable': grok_reachable,
         'error': grok_error
     }
-    
-    # SMTP health check
+
+
+def _probe_smtp():
+    """Check SMTP configuration and reachability for /health"""
     smtp_status = "healthy"
     smtp_configured = False
     smtp_reachable = False
     smtp_response_time_ms = None
     smtp_error = None
     
-    try:
-        import smtplib
-        from .services.email_service import get_smtp_config
-    except ImportError:
-        try:
-            import smtplib
-            from services.email_service import get_smtp_config
-        except ImportError:
-            smtp_error = "Email service not available"
-            smtp_status = "degraded"
-    
-    if smtp_error is None:
+    if _get_smtp_config is None:
+        smtp_error = "Email service not available"
+        smtp_status = "degraded"
+    else:
         try:
-            config = get_smtp_config()
+            config = _get_smtp_config()
             
             # Check if SMTP credentials are configured
             if config.get('user') and config.get('password') and config.get('from_email'):
@@ -269,19 +217,19 @@ def health_check():
                     host = config.get('host', 'smtp.mailgun.org')
                     port = config.get('port', 587)
                     
-                    # Try to connect to SMTP server (with timeout)
-                    server = smtplib.SMTP(timeout=2)
-                    server.connect(host, port)
-                    server.quit()
+                    # Reachability only needs the TCP handshake, not the SMTP
+                    # banner/EHLO/QUIT exchange
+                    sock = socket.create_connection((host, port), timeout=2)
+                    sock.close()
                     
                     smtp_response_time_ms = round((time.time() - start_time) * 1000, 2)
                     smtp_reachable = True
-                except smtplib.SMTPConnectError as e:
-                    smtp_error = f"SMTP connection error: {str(e)}"
+                except socket.timeout as e:
+                    smtp_error = f"SMTP connection timeout/error: {str(e)}"
                     smtp_status = "degraded"
                     smtp_reachable = False
-                except smtplib.SMTPException as e:
-                    smtp_error = f"SMTP error: {str(e)}"
+                except OSError as e:
+                    smtp_error = f"SMTP connection error: {str(e)}"
                     smtp_status = "degraded"
                     smtp_reachable = False
                 except Exception as e:
@@ -301,13 +249,130 @@ def health_check():
             smtp_status = "degraded"
             # SMTP is optional, so don't mark overall as unhealthy
     
-    services['smtp'] = {
+    return {
         'status': smtp_status,
         'configured': smtp_configured,
         'reachable': smtp_reachable,
         'response_time_ms': smtp_response_time_ms,
         'error': smtp_error
     }
+
+
+# Health check probes by service name. Each returns the service's entry in the
+# /health response; they run concurrently so a slow service doesn't add to the others.
+HEALTH_PROBES = {
+    'database': _probe_database,
+    'grok': _probe_grok,
+    'smtp': _probe_smtp,
+}
+
+# Wall-clock limit for each health probe. The first Firestore call on a cold
+# instance opens the gRPC channel and fetches credentials, which can take several
+# seconds, so the database gets more time than the TCP connect checks
+HEALTH_CHECK_TIMEOUT_SECONDS = {
+    'database': 10,
+    'grok': 3,
+    'smtp': 3,
+}
+
+_health_executor = ThreadPoolExecutor(max_workers=len(HEALTH_PROBES), thread_name_prefix='health')
+
+# Latest submitted probe by service name. A probe that outlives its timeout keeps
+# running in the executor, so later checks wait on it instead of queueing another
+# one behind it (at most one probe per service is ever pending)
+_health_probe_futures = {}
+_health_probe_futures_lock = threading.Lock()
+
+# Seconds a /health result is reused, so monitors polling every few seconds
+# don't each trigger a Firestore read, an HTTPS request and an SMTP connection
+HEALTH_CACHE_TTL_SECONDS = 10
+
+_health_cache = {'checked_at': 0.0, 'response': None, 'http_status': 200}
+_health_cache_lock = threading.Lock()
+
+# Refresh the health cache from a background thread instead of in the request
+# (set HEALTH_BG=1; off by default since Cloud Functions instances idle between requests)
+HEALTH_BACKGROUND = os.environ.get('HEALTH_BG', '0') == '1'
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """
+    Health check endpoint that reports status of database, Grok API, SMTP, and application.
+    Returns 200 if all services are healthy, 503 if any critical service is down.
+    
+    Results are reused for HEALTH_CACHE_TTL_SECONDS (or whatever the background
+    refresher last stored, with HEALTH_BG=1); pass ?nocache=1 to force fresh checks.
+    """
+    use_cache = request.args.get('nocache') != '1'
+    with _health_cache_lock:
+        if (use_cache and _health_cache['response'] is not None
+                and (HEALTH_BACKGROUND
+                     or time.monotonic() - _health_cache['checked_at'] < HEALTH_CACHE_TTL_SECONDS)):
+            return jsonify(_health_cache['response']), _health_cache['http_status']
+    
+    response, http_status = _refresh_health_cache()
+    return jsonify(response), http_status
+
+
+def _refresh_health_cache():
+    """
+    Run the health checks and store the result in _health_cache
+    
+    Returns:
+        tuple: (response dict, HTTP status code)
+    """
+    response, http_status = _run_health_checks()
+    with _health_cache_lock:
+        _health_cache.update(checked_at=time.monotonic(), response=response, http_status=http_status)
+    return response, http_status
+
+
+def _health_refresh_loop():
+    """Refresh the health cache every HEALTH_CACHE_TTL_SECONDS (background thread)"""
+    while True:
+        try:
+            _refresh_health_cache()
+        except Exception as e:
+            print(f"[Health] Background refresh failed: {e}")
+        time.sleep(HEALTH_CACHE_TTL_SECONDS)
+
+
+def _run_health_checks():
+    """
+    Run all health probes concurrently and summarize them
+    
+    Returns:
+        tuple: (response dict, HTTP status code)
+    """
+    futures = {}
+    with _health_probe_futures_lock:
+        for name, probe in HEALTH_PROBES.items():
+            future = _health_probe_futures.get(name)
+            if future is None or future.done():
+                future = _health_executor.submit(probe)
+                _health_probe_futures[name] = future
+            futures[name] = future
+    started_at = time.monotonic()
+    
+    services = {}
+    for name, future in futures.items():
+        timeout = HEALTH_CHECK_TIMEOUT_SECONDS[name]
+        try:
+            services[name] = future.result(timeout=max(0, started_at + timeout - time.monotonic()))
+        except FuturesTimeoutError:
+            # The database is critical; the other services are optional
+            services[name] = {
+                'status': "unhealthy" if name == 'database' else "degraded",
+                'error': f"Health check timed out after {timeout}s"
+            }
+    
+    db_status = services['database']['status']
+    grok_status = services['grok']['status']
+    smtp_status = services['smtp']['status']
+    
+    overall_status = "healthy"
+    http_status = 200
     
     # If database is down, mark overall as unhealthy
     if db_status == "unhealthy":
@@ -323,7 +388,11 @@ def health_check():
         'services': services
     }
     
-    return jsonify(response), http_status
+    return response, http_status
+
+
+if HEALTH_BACKGROUND:
+    threading.Thread(target=_health_refresh_loop, name='health-refresh', daemon=True).start()
 
 
 @app.route('/favicon.ico')
@@ -362,6 +431,6 @@ except ImportError:
 
 # Background threads disabled - Cloud Scheduler handles these tasks via scheduled functions:
 # - scheduled_notifications (runs every Friday at 9:00 AM)
-# - scheduled_cache_refresh (runs daily at 6:00 AM)
+# - scheduled_cache_refresh (runs hourly, refreshing a bounded batch of stale caches)
 # - scheduled_session_keepalive (runs every 8 hours)
 # These are configured in functions/scheduled_*.py files and managed by Firebase Function Scheduler
@@ -3,19 +3,103 @@
 Firebase Auth token verification utilities
 """
 
+import time
+import base64
+import hashlib
 import logging
+import threading
 from functools import wraps
-from flask import request, jsonify, abort
+from datetime import datetime, timezone
+from flask import request, jsonify, abort, g
 import firebase_admin
 from firebase_admin import auth
 
+# Import JSON helpers
+try:
+    from ..json_utils import loads as json_loads
+except ImportError:
+    from json_utils import loads as json_loads
+
 logger = logging.getLogger(__name__)
 
+# Successfully verified tokens, keyed by a hash of the token string, as
+# (decoded_token, exp) so repeat requests skip the signature check until expiry
+_verified_token_cache = {}
+_verified_token_lock = threading.Lock()
+VERIFIED_TOKEN_CACHE_SIZE = 4096
+
+# Users whose Firestore document is known to exist with a matching email_verified,
+# as (firebase_uid, email_verified) -> (user_id, expires_at), so authenticated
+# requests don't re-read the user document every time. User documents are only
+# deleted outside the app (console or admin scripts), so the TTL is kept short:
+# it bounds how long a deleted user keeps being treated as existing
+_user_exists_cache = {}
+_user_exists_lock = threading.Lock()
+USER_EXISTS_CACHE_TTL_SECONDS = 60
+USER_EXISTS_CACHE_SIZE = 10000
+
+# Clock skew tolerated when verifying tokens (and when rejecting expired ones early)
+TOKEN_CLOCK_SKEW_SECONDS = 60
+
+# Maximum writes in one Firestore WriteBatch
+FIRESTORE_BATCH_LIMIT = 500
+
+# Cached tokens are re-verified this many seconds before they expire
+TOKEN_EXPIRY_MARGIN_SECONDS = 30
+
+
+def _token_cache_key(token):
+    """Hash a token so the cache never holds the raw credential"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _unverified_exp(token):
+    """
+    Read the exp claim from a JWT payload without checking its signature
+    
+    Only used to reject stale tokens early; it never makes a token valid.
+    
+    Returns:
+        int: exp claim, or None if the token can't be decoded
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = json_loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except Exception:
+        return None
+    exp = claims.get('exp') if isinstance(claims, dict) else None
+    return exp if isinstance(exp, (int, float)) else None
+
+
+def _cache_verified_token(key, decoded_token):
+    """
+    Remember a verified token until its exp claim
+    
+    Args:
+        key: Result of _token_cache_key for the token
+        decoded_token: Decoded claims returned by Firebase Admin
+    """
+    exp = decoded_token.get('exp')
+    if not isinstance(exp, (int, float)):
+        return
+    with _verified_token_lock:
+        if len(_verified_token_cache) >= VERIFIED_TOKEN_CACHE_SIZE:
+            # Drop expired entries first; if the cache is still full, start over
+            now = time.time()
+            for stale_key in [k for k, (_, e) in _verified_token_cache.items() if e <= now]:
+                del _verified_token_cache[stale_key]
+            if len(_verified_token_cache) >= VERIFIED_TOKEN_CACHE_SIZE:
+                _verified_token_cache.clear()
+        _verified_token_cache[key] = (decoded_token, exp)
+
 
 def verify_firebase_token(token):
     """
     Verify a Firebase Auth token (ID token or session cookie) and return decoded token.
     
+    Successful verifications are cached in-process until the token's exp claim,
+    so repeat requests with the same token skip the signature check.
+    
     Args:
         token: The Firebase Auth ID token or session cookie string
         
@@ -29,16 +113,34 @@ def verify_firebase_token(token):
     if not firebase_admin._apps:
         raise Exception("Firebase Admin not initialized. Cannot verify tokens.")
     
+    # Tokens verified earlier are reused until shortly before they expire
+    key = _token_cache_key(token)
+    cached = _verified_token_cache.get(key)
+    if cached:
+        decoded_token, exp = cached
+        if time.time() < exp - TOKEN_EXPIRY_MARGIN_SECONDS:
+            return decoded_token
+        with _verified_token_lock:
+            _verified_token_cache.pop(key, None)
+    
+    # Stale cookies are common; reject clearly expired tokens without a signature check
+    exp = _unverified_exp(token)
+    if exp is not None and exp + TOKEN_CLOCK_SKEW_SECONDS < time.time():
+        logger.warning("Invalid or expired token: exp claim is in the past")
+        return None
+    
     try:
         # Try to verify as session cookie first (longer, more secure)
-        # Add clock skew tolerance (60 seconds) to handle time differences between client and server
+        # Add clock skew tolerance (TOKEN_CLOCK_SKEW_SECONDS) to handle time differences between client and server
         try:
-            decoded_token = auth.verify_session_cookie(token, clock_skew_seconds=60)
+            decoded_token = auth.verify_session_cookie(token, clock_skew_seconds=TOKEN_CLOCK_SKEW_SECONDS)
+            _cache_verified_token(key, decoded_token)
             return decoded_token
         except (auth.InvalidSessionCookieError, ValueError):
             # Not a session cookie, try as ID token
             try:
-                decoded_token = auth.verify_id_token(token, clock_skew_seconds=60)
+                decoded_token = auth.verify_id_token(token, clock_skew_seconds=TOKEN_CLOCK_SKEW_SECONDS)
+                _cache_verified_token(key, decoded_token)
                 return decoded_token
             except (auth.InvalidIdTokenError, auth.ExpiredIdTokenError) as e:
                 logger.warning(f"Invalid or expired ID token: {e}")
@@ -52,10 +154,18 @@ def get_id_token_from_request():
     """
     Extract Firebase Auth token from request.
     Checks Authorization header, session cookie, and ID token cookie.
+    The result is stored on flask.g, so later calls in the same request reuse it.
     
     Returns:
         str: Token (ID token or session cookie) if found, None otherwise
     """
+    if '_id_token' not in g:
+        g._id_token = _find_id_token()
+    return g._id_token
+
+
+def _find_id_token():
+    """Look up the token in the request headers and cookies (uncached part of get_id_token_from_request)"""
     # Check Authorization header (Bearer token)
     auth_header = request.headers.get('Authorization', '')
     if auth_header.startswith('Bearer '):
@@ -82,6 +192,73 @@ def get_id_token_from_request():
     return None
 
 
+def _get_or_verify():
+    """
+    Get and verify the current request's token at most once per request.
+    
+    The result is stored on flask.g, so decorators and the get_user_*_from_token
+    helpers share one cookie lookup and verification.
+    
+    Returns:
+        tuple: (token, decoded_token); either may be None
+    """
+    if '_auth_decoded' not in g:
+        id_token = get_id_token_from_request()
+        decoded_token = verify_firebase_token(id_token) if id_token else None
+        g._auth_token = id_token
+        g._auth_decoded = decoded_token
+    return g._auth_token, g._auth_decoded
+
+
+def _authenticate(require_verified_flag=False):
+    """
+    Authenticate the current request for require_auth/require_verified.
+    
+    Uses the per-request token from _get_or_verify(), so stacked decorators and
+    helpers never verify the same token twice. On success the decoded token is
+    attached as request.auth.
+    
+    Args:
+        require_verified_flag: Also require a verified email for API requests
+            (and log why authentication failed)
+        
+    Returns:
+        tuple: Error response and status code, or None if the request may proceed
+    """
+    id_token, decoded_token = _get_or_verify()
+    
+    if not id_token:
+        if require_verified_flag:
+            logger.warning(
+                f"require_verified: No token found for {request.path} "
+                f"(method: {request.method}, cookies: {list(request.cookies.keys())})"
+            )
+        # Return 401 for all requests when no token is present
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    if not decoded_token:
+        if require_verified_flag:
+            logger.warning(
+                f"require_verified: Token verification failed for {request.path} "
+                f"(token preview: {id_token[:50]}...)"
+            )
+        # Return 401 for all requests when token is invalid
+        return jsonify({'error': 'Invalid or expired token'}), 401
+    
+    # Check email verification
+    # Note: We allow unverified users to access pages, but they'll see a verification notice
+    # This is less strict than the old system to allow users to use the app immediately after signup
+    if require_verified_flag and not decoded_token.get('email_verified', False):
+        # For API requests, still require verification for security
+        if request.is_json or request.path.startswith('/api/'):
+            return jsonify({'error': 'Email not verified'}), 403
+        # For page requests, allow access but the template can show a verification notice
+    
+    # Attach decoded token to request for use in route handler
+    request.auth = decoded_token
+    return None
+
+
 def require_auth(f):
     """
     Decorator to require Firebase Auth authentication.
@@ -97,40 +274,19 @@ def require_auth(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Get ID token from request
-        id_token = get_id_token_from_request()
-        
-        if not id_token:
-            # Return 401 for all requests when no token is present
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({'error': 'Authentication required'}), 401
-            else:
-                return jsonify({'error': 'Authentication required'}), 401
-        
-        # Verify token
-        decoded_token = verify_firebase_token(id_token)
-        
-        if not decoded_token:
-            # Return 401 for all requests when token is invalid
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({'error': 'Invalid or expired token'}), 401
-            else:
-                return jsonify({'error': 'Invalid or expired token'}), 401
-        
-        # Attach decoded token to request for use in route handler
-        request.auth = decoded_token
+        error = _authenticate()
+        if error:
+            return error
         
         # Ensure Firestore user document exists
         try:
-            firebase_uid = decoded_token.get('uid')
-            email = decoded_token.get('email')
-            email_verified = decoded_token.get('email_verified', False)
+            firebase_uid = request.auth.get('uid')
+            email = request.auth.get('email')
+            email_verified = request.auth.get('email_verified', False)
             if firebase_uid and email:
                 ensure_firestore_user_exists(firebase_uid, email, email_verified)
         except Exception as e:
             # Log but don't fail - user can still access if Firestore is down
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Failed to ensure Firestore user exists: {e}")
         
         return f(*args, **kwargs)
@@ -153,46 +309,9 @@ def require_verified(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # First check authentication
-        id_token = get_id_token_from_request()
-        
-        if not id_token:
-            logger.warning(
-                f"require_verified: No token found for {request.path} "
-                f"(method: {request.method}, cookies: {list(request.cookies.keys())})"
-            )
-            # Return 401 for all requests when no token is present
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({'error': 'Authentication required'}), 401
-            else:
-                return jsonify({'error': 'Authentication required'}), 401
-        
-        decoded_token = verify_firebase_token(id_token)
-        
-        if not decoded_token:
-            logger.warning(
-                f"require_verified: Token verification failed for {request.path} "
-                f"(token preview: {id_token[:50] if id_token else 'None'}...)"
-            )
-            # Return 401 for all requests when token is invalid
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({'error': 'Invalid or expired token'}), 401
-            else:
-                return jsonify({'error': 'Invalid or expired token'}), 401
-        
-        # Check email verification
-        # Note: We allow unverified users to access pages, but they'll see a verification notice
-        # This is less strict than the old system to allow users to use the app immediately after signup
-        if not decoded_token.get('email_verified', False):
-            # For API requests, still require verification for security
-            if request.is_json or request.path.startswith('/api/'):
-                return jsonify({'error': 'Email not verified'}), 403
-            # For page requests, allow access but the template can show a verification notice
-            # Don't redirect - let them use the app
-            pass
-        
-        # Attach decoded token to request
-        request.auth = decoded_token
+        error = _authenticate(require_verified_flag=True)
+        if error:
+            return error
         
         return f(*args, **kwargs)
     
@@ -210,11 +329,9 @@ def get_user_id_from_token():
     if hasattr(request, 'auth') and request.auth:
         return request.auth.get('uid')
     
-    id_token = get_id_token_from_request()
-    if id_token:
-        decoded_token = verify_firebase_token(id_token)
-        if decoded_token:
-            return decoded_token.get('uid')
+    _, decoded_token = _get_or_verify()
+    if decoded_token:
+        return decoded_token.get('uid')
     
     return None
 
@@ -230,11 +347,9 @@ def get_user_email_from_token():
     if hasattr(request, 'auth') and request.auth:
         return request.auth.get('email')
     
-    id_token = get_id_token_from_request()
-    if id_token:
-        decoded_token = verify_firebase_token(id_token)
-        if decoded_token:
-            return decoded_token.get('email')
+    _, decoded_token = _get_or_verify()
+    if decoded_token:
+        return decoded_token.get('email')
     
     return None
 
@@ -243,77 +358,183 @@ def ensure_firestore_user_exists(firebase_uid, email, email_verified=False):
     """
     Ensure a Firestore user document exists for a Firebase Auth user.
     Creates the document if it doesn't exist, or updates it with firebase_uid if it does.
+    The outcome is remembered for USER_EXISTS_CACHE_TTL_SECONDS, so repeat calls for
+    the same user skip Firestore.
     
     Args:
         firebase_uid: Firebase Auth UID
         email: User email
         email_verified: Whether email is verified
         
+    Returns:
+        str: Firestore user document ID
+    """
+    cache_key = (firebase_uid, bool(email_verified))
+    with _user_exists_lock:
+        cached = _user_exists_cache.get(cache_key)
+    if cached and time.time() < cached[1]:
+        return cached[0]
+    
+    user_id = _ensure_firestore_user_document(firebase_uid, email, email_verified)
+    
+    with _user_exists_lock:
+        if len(_user_exists_cache) >= USER_EXISTS_CACHE_SIZE:
+            _user_exists_cache.clear()
+        _user_exists_cache[cache_key] = (user_id, time.time() + USER_EXISTS_CACHE_TTL_SECONDS)
+    return user_id
+
+
+def _ensure_firestore_user_document(firebase_uid, email, email_verified):
+    """
+    Read, update or create the Firestore user document (uncached part of
+    ensure_firestore_user_exists)
+    
     Returns:
         str: Firestore user document ID
     """
     try:
         from ..db import users_collection
-        from ..services.user_service import get_user_by_email, create_user
-        from datetime import datetime
     except ImportError:
         from db import users_collection
-        from services.user_service import get_user_by_email, create_user
-        from datetime import datetime
     
     if users_collection is None:
         raise Exception("Firestore connection not available")
     
-    # First, check if a user document exists with this firebase_uid
     user_doc_by_uid = users_collection.document(firebase_uid).get()
+    user_id, write = _plan_user_document_write(
+        users_collection, user_doc_by_uid, firebase_uid, email, email_verified,
+        datetime.now(timezone.utc)
+    )
+    if write:
+        method, doc_ref, data = write
+        getattr(doc_ref, method)(data)
+    return user_id
+
+
+def _plan_user_document_write(users_collection, user_doc_by_uid, firebase_uid, email, email_verified, now):
+    """
+    Work out which user document a Firebase Auth user maps to and the write it needs
+    
+    Args:
+        users_collection: Firestore users collection
+        user_doc_by_uid: Snapshot of users/{firebase_uid}
+        firebase_uid: Firebase Auth UID
+        email: User email
+        email_verified: Whether email is verified
+        now: Timestamp for created_at/updated_at
+        
+    Returns:
+        tuple: (user_id, write) where write is None or (method, document reference, data)
+        with method 'update' or 'set'
+    """
+    try:
+        from ..services.user_service import get_user_by_email
+    except ImportError:
+        from services.user_service import get_user_by_email
+    
+    # First, check if a user document exists with this firebase_uid
     if user_doc_by_uid.exists:
         # User exists with firebase_uid as document ID - update email verification if needed
         user_data = user_doc_by_uid.to_dict()
         if user_data.get('email_verified') != email_verified:
-            users_collection.document(firebase_uid).update({
+            return firebase_uid, ('update', users_collection.document(firebase_uid), {
                 'email_verified': email_verified,
-                'updated_at': datetime.utcnow()
+                'updated_at': now
             })
-        return firebase_uid
+        return firebase_uid, None
     
     # Try to find user by email (for existing users from old system)
     user_id = get_user_by_email(email)
     
     if user_id:
         # User exists in Firestore with old ID - update with firebase_uid
+        # Return the existing user_id (not firebase_uid) for backward compatibility
         user_doc = users_collection.document(str(user_id)).get()
         if user_doc.exists:
             user_data = user_doc.to_dict()
             if not user_data.get('firebase_uid'):
                 # Update existing document with firebase_uid
-                users_collection.document(str(user_id)).update({
+                return str(user_id), ('update', users_collection.document(str(user_id)), {
                     'firebase_uid': firebase_uid,
                     'email_verified': email_verified,
-                    'updated_at': datetime.utcnow()
+                    'updated_at': now
                 })
             elif user_data.get('email_verified') != email_verified:
                 # Update email verification status
-                users_collection.document(str(user_id)).update({
+                return str(user_id), ('update', users_collection.document(str(user_id)), {
                     'email_verified': email_verified,
-                    'updated_at': datetime.utcnow()
+                    'updated_at': now
                 })
-        # Return the existing user_id (not firebase_uid) for backward compatibility
-        return str(user_id)
-    else:
-        # User doesn't exist in Firestore - create new user document
-        # Use firebase_uid as the document ID for new users
-        user_data = {
-            'username': email,  # Email stored in username field
-            'firebase_uid': firebase_uid,
-            'email_verified': email_verified,
-            'credentials': [],  # Array for multiple passkeys (now handled by Firebase Auth)
-            'projects_processed_limit': 500,  # Default limit for new users
-            'credits_low_email_sent': False,
-            'credits_exhausted_email_sent': False,
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
+        return str(user_id), None
+    
+    # User doesn't exist in Firestore - create new user document
+    # Use firebase_uid as the document ID for new users
+    user_data = {
+        'username': email,  # Email stored in username field
+        'firebase_uid': firebase_uid,
+        'email_verified': email_verified,
+        'credentials': [],  # Array for multiple passkeys (now handled by Firebase Auth)
+        'projects_processed_limit': 500,  # Default limit for new users
+        'credits_low_email_sent': False,
+        'credits_exhausted_email_sent': False,
+        'created_at': now,
+        'updated_at': now
+    }
+    return firebase_uid, ('set', users_collection.document(firebase_uid), user_data)
+
+
+def ensure_firestore_users_exist(users):
+    """
+    Ensure Firestore user documents exist for many Firebase Auth users at once.
+    
+    For migrations and backfills: the users/{firebase_uid} documents are read with one
+    get_all() per FIRESTORE_BATCH_LIMIT users, and the resulting writes are committed
+    in a single WriteBatch per group instead of one round trip each.
+    
+    Args:
+        users: Iterable of (firebase_uid, email, email_verified) tuples
+        
+    Returns:
+        list: Firestore user document IDs, in the same order as users
+    """
+    try:
+        from ..db import db, users_collection
+    except ImportError:
+        from db import db, users_collection
+    
+    if db is None or users_collection is None:
+        raise Exception("Firestore connection not available")
+    
+    users = list(users)
+    user_ids = []
+    for i in range(0, len(users), FIRESTORE_BATCH_LIMIT):
+        group = users[i:i + FIRESTORE_BATCH_LIMIT]
+        snapshots = {
+            snapshot.id: snapshot
+            for snapshot in db.get_all([users_collection.document(uid) for uid, _, _ in group])
         }
         
-        # Create document with firebase_uid as ID
-        users_collection.document(firebase_uid).set(user_data)
-        return firebase_uid
+        now = datetime.now(timezone.utc)
+        batch = db.batch()
+        pending = 0
+        group_ids = []
+        for firebase_uid, email, email_verified in group:
+            user_id, write = _plan_user_document_write(
+                users_collection, snapshots[firebase_uid], firebase_uid, email, email_verified, now
+            )
+            if write:
+                method, doc_ref, data = write
+                getattr(batch, method)(doc_ref, data)
+                pending += 1
+            group_ids.append(user_id)
+        if pending:
+            batch.commit()
+        
+        expires_at = time.time() + USER_EXISTS_CACHE_TTL_SECONDS
+        with _user_exists_lock:
+            if len(_user_exists_cache) + len(group) > USER_EXISTS_CACHE_SIZE:
+                _user_exists_cache.clear()
+            for (firebase_uid, _, email_verified), user_id in zip(group, group_ids):
+                _user_exists_cache[(firebase_uid, bool(email_verified))] = (user_id, expires_at)
+        user_ids.extend(group_ids)
+    return user_ids
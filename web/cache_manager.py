@@ -117,39 +117,20 @@ def is_cache_fresh(
         # Resolve user_id
         current_user_id, old_user_id = resolve_user_id_for_query(user_id)
         
-        # Try with current user_id first
-        query = collection.where(filter=FieldFilter('user_id', '==', current_user_id)).limit(1).stream()
-        docs = list(query)
-        
-        # If not found and we have old_user_id, try that
-        if not docs and old_user_id:
-            query = collection.where(filter=FieldFilter('user_id', '==', old_user_id)).limit(1).stream()
-            docs = list(query)
-        
-        if not docs:
-            return False
-        
-        cache_doc = docs[0].to_dict()
-        cached_at = cache_doc.get('cached_at')
-        if not cached_at:
-            return False
-        
-        # Ensure both datetimes are timezone-aware for comparison
-        now = datetime.now(timezone.utc)
-        
-        # Convert cached_at to timezone-aware if it's naive
-        if isinstance(cached_at, datetime):
-            if cached_at.tzinfo is None:
-                # Naive datetime - assume UTC
-                cached_at = cached_at.replace(tzinfo=timezone.utc)
-            # If already timezone-aware, use as-is
-        else:
-            # Not a datetime object, can't compare
-            return False
-        
-        # Check if cache is older than max_age_hours
-        age = now - cached_at
-        return age < timedelta(hours=max_age_hours)
+        # Firestore does the age comparison: a fresh cache is any document for the
+        # user with cached_at inside the window (ID-only projection, first match only)
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        for candidate_user_id in (current_user_id, old_user_id):
+            if not candidate_user_id:
+                continue
+            query = collection.where(
+                filter=FieldFilter('user_id', '==', candidate_user_id)
+            ).where(
+                filter=FieldFilter('cached_at', '>=', cutoff)
+            ).select([]).limit(1)
+            if next(query.stream(), None) is not None:
+                return True
+        return False
     except Exception as e:
         print(f"Error checking cache freshness: {e}")
         return False
@@ -262,13 +243,16 @@ def get_cache_stats(collection, user_id: str) -> Dict[str, Any]:
         # Resolve user_id
         current_user_id, old_user_id = resolve_user_id_for_query(user_id)
         
+        # Only the stats fields are read, not the projects array
+        stats_fields = ['cached_at', 'last_updated', 'total_count']
+        
         # Try with current user_id first
-        query = collection.where(filter=FieldFilter('user_id', '==', current_user_id)).limit(1).stream()
+        query = collection.where(filter=FieldFilter('user_id', '==', current_user_id)).select(stats_fields).limit(1).stream()
         docs = list(query)
         
         # If not found and we have old_user_id, try that
         if not docs and old_user_id:
-            query = collection.where(filter=FieldFilter('user_id', '==', old_user_id)).limit(1).stream()
+            query = collection.where(filter=FieldFilter('user_id', '==', old_user_id)).select(stats_fields).limit(1).stream()
             docs = list(query)
         
         if not docs:
@@ -378,7 +362,7 @@ def get_cached_project_details(collection, project_id: str) -> Optional[Dict[str
     try:
         if collection is None:
             return None
-        query = collection.where(filter=FieldFilter('project_id', '==', str(project_id))).limit(1).stream()
+        query = collection.where(filter=FieldFilter('project_id', '==', str(project_id))).select(['details']).limit(1).stream()
         docs = list(query)
         if docs:
             cache_doc = docs[0].to_dict()
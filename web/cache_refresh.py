@@ -5,11 +5,11 @@ Background cache refresh module
 
 import threading
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from google.cloud.firestore_v1.base_query import FieldFilter
-from .cache_manager import is_cache_fresh, refresh_project_cache
-from .ai_analyzer import analyze_projects_batch
+from .cache_manager import refresh_project_cache
 
 # Import services needed for fetching projects
 try:
@@ -19,6 +19,21 @@ except ImportError:
     from services.respondent_auth_service import create_respondent_session, verify_respondent_authentication
     from services.project_service import fetch_all_respondent_projects
 
+# Maximum number of stale caches refreshed per run. Each refresh verifies the
+# session and fetches every project page (several seconds per user), so this
+# many fit in the scheduled function's 540s timeout
+REFRESH_BATCH_SIZE = 50
+
+# Stop starting new refreshes after this many seconds, leaving headroom before
+# the scheduled function's 540s timeout
+REFRESH_TIME_BUDGET_SECONDS = 480
+
+# Maximum values in one Firestore 'in' filter
+FIRESTORE_IN_LIMIT = 30
+
+# Number of sessions pinged at once by keep_sessions_alive
+KEEPALIVE_CONCURRENCY = 16
+
 
 def start_background_refresh(
     check_interval_hours: int = 1,
@@ -46,12 +61,29 @@ def start_background_refresh(
     return thread
 
 
-def refresh_stale_caches(max_age_hours: int = 24):
+def refresh_stale_caches(max_age_hours: int = 24, limit: Optional[int] = REFRESH_BATCH_SIZE):
     """
-    Refresh all stale caches by fetching projects from Respondent.io API
+    Refresh stale caches by fetching projects from Respondent.io API
+    
+    Only caches whose cached_at is older than max_age_hours are read, oldest first,
+    so Firestore (not this loop) filters out fresh caches. A successful refresh
+    rewrites cached_at, which moves the cache to the back of the queue.
+    
+    Every attempt, successful or not, records refresh_attempted_at on the cache.
+    Caches attempted within the last max_age_hours are paged past, so caches
+    that keep failing (dead sessions, missing keys) are retried once per
+    max_age_hours and never hold up the rest of the queue.
+    
+    Caches without a cached_at are deliberately not visited (Firestore range
+    filters skip documents missing the field, and finding them would take a
+    full collection scan every run). refresh_project_cache always writes
+    cached_at, so only documents written outside the app lack it; they are still
+    treated as stale by is_cache_fresh and get rewritten, with cached_at, the
+    next time their user loads projects.
     
     Args:
         max_age_hours: Maximum age of cache before refresh
+        limit: Maximum number of caches to refresh in this run (None for no limit)
     """
     try:
         # Import collections from db module
@@ -63,77 +95,118 @@ def refresh_stale_caches(max_age_hours: int = 24):
         if projects_cache_collection is None or session_keys_collection is None:
             return
         
-        # Get all cached users
-        cached_users = projects_cache_collection.stream()
+        started = time.monotonic()
+        
+        # Get stale caches, oldest first (only the fields needed here are read,
+        # not the projects array)
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        stale_query = projects_cache_collection.where(
+            filter=FieldFilter('cached_at', '<', cutoff)
+        ).order_by('cached_at').select(['user_id', 'cached_at', 'refresh_attempted_at'])
+        
+        # Page past caches already attempted within the window, so repeated
+        # failures at the head of the queue can't starve the rest
+        stale_caches = []
+        page_size = limit or REFRESH_BATCH_SIZE
+        last_doc = None
+        while not limit or len(stale_caches) < limit:
+            page_query = stale_query.start_after(last_doc) if last_doc else stale_query
+            page = list(page_query.limit(page_size).stream())
+            for cache_doc in page:
+                cache_data = cache_doc.to_dict()
+                user_id = cache_data.get('user_id')
+                attempted_at = cache_data.get('refresh_attempted_at')
+                if isinstance(attempted_at, datetime) and attempted_at.tzinfo is None:
+                    attempted_at = attempted_at.replace(tzinfo=timezone.utc)
+                if not user_id or (isinstance(attempted_at, datetime) and attempted_at >= cutoff):
+                    continue
+                stale_caches.append((str(user_id), cache_doc.reference))
+                if limit and len(stale_caches) >= limit:
+                    break
+            if len(page) < page_size:
+                break
+            last_doc = page[-1]
+        stale_user_ids = [user_id for user_id, _ in stale_caches]
+        
+        # Fetch the session keys for all stale users up front, FIRESTORE_IN_LIMIT
+        # users per query, instead of one query per user
+        session_configs = {}
+        for i in range(0, len(stale_user_ids), FIRESTORE_IN_LIMIT):
+            chunk = stale_user_ids[i:i + FIRESTORE_IN_LIMIT]
+            session_query = session_keys_collection.where(
+                filter=FieldFilter('user_id', 'in', chunk)
+            ).select(['user_id', 'cookies', 'profile_id'])
+            for session_doc in session_query.stream():
+                session_data = session_doc.to_dict()
+                session_configs.setdefault(session_data.get('user_id'), session_data)
         
         refreshed_count = 0
         error_count = 0
         
-        for cache_doc in cached_users:
-            cache_data = cache_doc.to_dict()
-            user_id = cache_data.get('user_id')
-            if not user_id:
-                continue
+        for user_id, cache_ref in stale_caches:
+            if time.monotonic() - started > REFRESH_TIME_BUDGET_SECONDS:
+                print("[Background Refresh] Time budget reached, leaving remaining caches for the next run")
+                break
             
-            # Check if cache is stale
-            if not is_cache_fresh(projects_cache_collection, str(user_id), max_age_hours):
-                try:
-                    # Get user's session keys
-                    query = session_keys_collection.where(filter=FieldFilter('user_id', '==', str(user_id))).limit(1).stream()
-                    docs = list(query)
-                    if not docs:
-                        print(f"[Background Refresh] No session keys found for user {user_id}, skipping")
-                        continue
-                    
-                    config_doc = docs[0].to_dict()
-                    cookies = config_doc.get('cookies', {})
-                    profile_id = config_doc.get('profile_id')
-                    
-                    if not cookies.get('respondent.session.sid') or not profile_id:
-                        print(f"[Background Refresh] Missing session keys or profile_id for user {user_id}, skipping")
-                        continue
-                    
-                    # Verify session is still valid
-                    print(f"[Background Refresh] Verifying session for user {user_id} before refresh...")
-                    verification = verify_respondent_authentication(cookies)
-                    if not verification.get('success'):
-                        print(f"[Background Refresh] Session invalid for user {user_id}: {verification.get('message', 'Unknown error')}")
-                        error_count += 1
-                        continue
-                    
-                    # Create authenticated session
-                    req_session = create_respondent_session(cookies=cookies)
-                    
-                    # Fetch all projects (this will bypass cache since use_cache=False)
-                    print(f"[Background Refresh] Fetching projects for user {user_id} (profile_id={profile_id})...")
-                    all_projects, total_count = fetch_all_respondent_projects(
-                        session=req_session,
-                        profile_id=profile_id,
-                        page_size=50,
-                        user_id=str(user_id),
-                        use_cache=False,  # Force fresh fetch
-                        cookies=cookies
+            try:
+                # Record the attempt first, so a failure below doesn't leave this
+                # cache at the head of the queue for the next run
+                cache_ref.update({'refresh_attempted_at': datetime.now(timezone.utc)})
+                
+                # Get user's session keys
+                config_doc = session_configs.get(user_id)
+                if not config_doc:
+                    print(f"[Background Refresh] No session keys found for user {user_id}, skipping")
+                    continue
+                
+                cookies = config_doc.get('cookies', {})
+                profile_id = config_doc.get('profile_id')
+                
+                if not cookies.get('respondent.session.sid') or not profile_id:
+                    print(f"[Background Refresh] Missing session keys or profile_id for user {user_id}, skipping")
+                    continue
+                
+                # Verify session is still valid
+                print(f"[Background Refresh] Verifying session for user {user_id} before refresh...")
+                verification = verify_respondent_authentication(cookies)
+                if not verification.get('success'):
+                    print(f"[Background Refresh] Session invalid for user {user_id}: {verification.get('message', 'Unknown error')}")
+                    error_count += 1
+                    continue
+                
+                # Create authenticated session
+                req_session = create_respondent_session(cookies=cookies)
+                
+                # Fetch all projects (this will bypass cache since use_cache=False)
+                print(f"[Background Refresh] Fetching projects for user {user_id} (profile_id={profile_id})...")
+                all_projects, total_count = fetch_all_respondent_projects(
+                    session=req_session,
+                    profile_id=profile_id,
+                    page_size=50,
+                    user_id=str(user_id),
+                    use_cache=False,  # Force fresh fetch
+                    cookies=cookies
+                )
+                
+                # Update cache with fresh data
+                if all_projects and len(all_projects) > 0:
+                    refresh_project_cache(
+                        projects_cache_collection,
+                        str(user_id),
+                        all_projects,
+                        total_count
                     )
-                    
-                    # Update cache with fresh data
-                    if all_projects and len(all_projects) > 0:
-                        refresh_project_cache(
-                            projects_cache_collection,
-                            str(user_id),
-                            all_projects,
-                            total_count
-                        )
-                        print(f"[Background Refresh] Successfully refreshed cache for user {user_id}: {len(all_projects)} projects")
-                        refreshed_count += 1
-                    else:
-                        print(f"[Background Refresh] No projects fetched for user {user_id}")
-                        error_count += 1
-                        
-                except Exception as e:
-                    print(f"[Background Refresh] Error refreshing cache for user {user_id}: {e}")
-                    import traceback
-                    print(traceback.format_exc())
+                    print(f"[Background Refresh] Successfully refreshed cache for user {user_id}: {len(all_projects)} projects")
+                    refreshed_count += 1
+                else:
+                    print(f"[Background Refresh] No projects fetched for user {user_id}")
                     error_count += 1
+                    
+            except Exception as e:
+                print(f"[Background Refresh] Error refreshing cache for user {user_id}: {e}")
+                import traceback
+                print(traceback.format_exc())
+                error_count += 1
         
         if refreshed_count > 0 or error_count > 0:
             print(f"[Background Refresh] Completed: {refreshed_count} refreshed, {error_count} errors")
@@ -144,6 +217,50 @@ def refresh_stale_caches(max_age_hours: int = 24):
         print(traceback.format_exc())
 
 
+def _keep_session_alive(user_id, cookies):
+    """
+    Ping Respondent.io with a user's session cookies to keep the session from expiring
+    
+    Args:
+        user_id: User ID (for logging)
+        cookies: Dictionary of Respondent.io cookie name-value pairs
+        
+    Returns:
+        str: 'alive', 'expired' or 'error'
+    """
+    try:
+        # Create authenticated session using the same method as the rest of the app
+        # This ensures we're using the exact same authentication pattern
+        print(f"[Session Keep-Alive] Checking session for user {user_id}...")
+        req_session = create_respondent_session(cookies=cookies)
+        
+        # Make verification request to keep session alive
+        auth_url = "https://app.respondent.io/v2/respondents/me"
+        start_time = time.time()
+        print(f"[Respondent.io API] GET {auth_url} (verify_authentication)")
+        response = req_session.get(auth_url, timeout=30)
+        elapsed_time = time.time() - start_time
+        print(f"[Respondent.io API] Response: {response.status_code} ({elapsed_time:.2f}s)")
+        
+        if response.status_code == 200:
+            print(f"[Session Keep-Alive] ✓ Session alive for user {user_id}")
+            return 'alive'
+        
+        error_msg = f"Authentication failed: {response.status_code}"
+        if response.status_code == 401:
+            error_msg = "Authentication failed: Unauthorized (401)"
+        elif response.status_code == 403:
+            error_msg = "Authentication failed: Forbidden (403)"
+        print(f"[Session Keep-Alive] ✗ Session expired for user {user_id}: {error_msg}")
+        return 'expired'
+            
+    except Exception as e:
+        print(f"[Session Keep-Alive] Error for user {user_id}: {e}")
+        import traceback
+        print(traceback.format_exc())
+        return 'error'
+
+
 def keep_sessions_alive():
     """
     Keep all user sessions alive by making periodic API requests to Respondent.io
@@ -151,7 +268,8 @@ def keep_sessions_alive():
     
     Uses create_respondent_session() to create authenticated sessions and makes requests
     to /v2/respondents/me to verify and keep sessions alive, matching the authentication
-    pattern used throughout the app.
+    pattern used throughout the app. Users are checked concurrently (up to
+    KEEPALIVE_CONCURRENCY at a time) over the shared connection pool.
     """
     try:
         # Import collections from db module
@@ -172,46 +290,27 @@ def keep_sessions_alive():
         error_count = 0
         skipped_count = 0
         
-        for session_doc in all_sessions:
-            session_data = session_doc.to_dict()
-            user_id = session_data.get('user_id')
-            cookies = session_data.get('cookies', {})
-            
-            if not user_id or not cookies.get('respondent.session.sid'):
-                skipped_count += 1
-                continue
-            
-            try:
-                # Create authenticated session using the same method as the rest of the app
-                # This ensures we're using the exact same authentication pattern
-                print(f"[Session Keep-Alive] Checking session for user {user_id}...")
-                req_session = create_respondent_session(cookies=cookies)
+        with ThreadPoolExecutor(max_workers=KEEPALIVE_CONCURRENCY) as executor:
+            futures = []
+            for session_doc in all_sessions:
+                session_data = session_doc.to_dict()
+                user_id = session_data.get('user_id')
+                cookies = session_data.get('cookies', {})
                 
-                # Make verification request to keep session alive
-                auth_url = "https://app.respondent.io/v2/respondents/me"
-                start_time = time.time()
-                print(f"[Respondent.io API] GET {auth_url} (verify_authentication)")
-                response = req_session.get(auth_url, timeout=30)
-                elapsed_time = time.time() - start_time
-                print(f"[Respondent.io API] Response: {response.status_code} ({elapsed_time:.2f}s)")
+                if not user_id or not cookies.get('respondent.session.sid'):
+                    skipped_count += 1
+                    continue
                 
-                if response.status_code == 200:
+                futures.append(executor.submit(_keep_session_alive, user_id, cookies))
+            
+            for future in as_completed(futures):
+                status = future.result()
+                if status == 'alive':
                     kept_alive_count += 1
-                    print(f"[Session Keep-Alive] ✓ Session alive for user {user_id}")
-                else:
+                elif status == 'expired':
                     expired_count += 1
-                    error_msg = f"Authentication failed: {response.status_code}"
-                    if response.status_code == 401:
-                        error_msg = "Authentication failed: Unauthorized (401)"
-                    elif response.status_code == 403:
-                        error_msg = "Authentication failed: Forbidden (403)"
-                    print(f"[Session Keep-Alive] ✗ Session expired for user {user_id}: {error_msg}")
-                    
-            except Exception as e:
-                error_count += 1
-                print(f"[Session Keep-Alive] Error for user {user_id}: {e}")
-                import traceback
-                print(traceback.format_exc())
+                else:
+                    error_count += 1
         
         # Print summary
         total = kept_alive_count + expired_count + error_count + skipped_count
@@ -222,4 +321,3 @@ def keep_sessions_alive():
         print(f"[Session Keep-Alive] Error in keep_sessions_alive: {e}")
         import traceback
         print(traceback.format_exc())
-
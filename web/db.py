@@ -8,22 +8,25 @@ import os
 import logging
 import firebase_admin
 from firebase_admin import credentials, firestore
-from dotenv import load_dotenv
 from pathlib import Path
 
+# Import environment helpers
+try:
+    from .env_utils import load_env, first_env
+except ImportError:
+    from env_utils import load_env, first_env
+
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 PROJECT_ROOT = Path(__file__).parent.parent
-load_dotenv(PROJECT_ROOT / '.env')
+load_env()
 
 # Firebase/Firestore connection
 # Use GCP_PROJECT or GCLOUD_PROJECT (set by Cloud Functions) or PROJECT_ID (for local dev)
 # Note: Cannot use FIREBASE_PROJECT_ID as env var (reserved prefix in Cloud Functions)
-FIREBASE_PROJECT_ID = (os.environ.get('GCP_PROJECT') or 
-                       os.environ.get('GCLOUD_PROJECT') or 
-                       os.environ.get('PROJECT_ID'))
+FIREBASE_PROJECT_ID = first_env('GCP_PROJECT', 'GCLOUD_PROJECT', 'PROJECT_ID')
 
 # Initialize collections as None (will be set if connection succeeds)
 db = None
@@ -39,6 +42,7 @@ project_details_collection = None
 topics_collection = None
 ai_analysis_cache_collection = None
 user_notifications_collection = None
+grok_response_cache_collection = None
 firestore_available = False
 
 try:
@@ -111,13 +115,14 @@ try:
     topics_collection = db.collection('topics')
     ai_analysis_cache_collection = db.collection('ai_analysis_cache')
     user_notifications_collection = db.collection('user_notifications')
+    grok_response_cache_collection = db.collection('grok_response_cache')
     logger.debug("Firestore collections set up successfully")
     
     # Test connection by attempting a simple operation
     try:
         # Try to read from a collection (this will fail if permissions are wrong)
         logger.debug("Testing Firestore connection...")
-        list(users_collection.limit(1).stream())
+        next(users_collection.select([]).limit(1).stream(), None)
         logger.debug("Firestore connection test successful")
     except Exception as perm_error:
         logger.warning(
@@ -151,6 +156,7 @@ except ValueError as e:
             topics_collection = db.collection('topics')
             ai_analysis_cache_collection = db.collection('ai_analysis_cache')
             user_notifications_collection = db.collection('user_notifications')
+            grok_response_cache_collection = db.collection('grok_response_cache')
             firestore_available = True
             logger.info("Firestore connection established successfully (using existing Firebase Admin initialization)")
         except Exception as client_error:
@@ -171,6 +177,7 @@ except ValueError as e:
             topics_collection = None
             ai_analysis_cache_collection = None
             user_notifications_collection = None
+            grok_response_cache_collection = None
             firestore_available = False
     else:
         logger.error(
@@ -193,6 +200,7 @@ except ValueError as e:
         topics_collection = None
         ai_analysis_cache_collection = None
         user_notifications_collection = None
+        grok_response_cache_collection = None
         firestore_available = False
 except Exception as e:
     logger.error(
@@ -216,4 +224,5 @@ except Exception as e:
     topics_collection = None
     ai_analysis_cache_collection = None
     user_notifications_collection = None
+    grok_response_cache_collection = None
     firestore_available = False
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Environment helpers
+Loads the project .env file once per process and resolves fallback chains of variables
+"""
+
+import os
+import functools
+from pathlib import Path
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@functools.cache
+def load_env():
+    """
+    Load PROJECT_ROOT/.env into os.environ once per process
+
+    Every module that reads configuration calls this at import time; only the
+    first call parses the file. Variables already set in the environment win.
+
+    Returns:
+        bool: True if a .env file was found and loaded
+    """
+    if load_dotenv is None:
+        return False
+    return load_dotenv(PROJECT_ROOT / '.env')
+
+
+def first_env(*names, default=None):
+    """
+    Return the first non-empty environment variable among names
+
+    Args:
+        *names: Variable names in order of preference
+        default: Value returned when none of them is set
+
+    Returns:
+        str: The first non-empty value, or default
+    """
+    return next((value for value in map(os.environ.get, names) if value), default)
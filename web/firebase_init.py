@@ -6,22 +6,91 @@ Handles credential setup for both local development and Cloud Functions
 
 import os
 import logging
+import functools
+import threading
 import firebase_admin
 from firebase_admin import credentials as firebase_creds
 from pathlib import Path
 
+# Import JSON and environment helpers
+try:
+    from .json_utils import loads as json_loads
+    from .env_utils import first_env
+except ImportError:
+    from json_utils import loads as json_loads
+    from env_utils import first_env
+
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
+# Serializes first-time initialization across threads
+_init_lock = threading.Lock()
+
+# Parsed service account credentials keyed by (path, mtime), so re-initializing
+# after the default app is deleted doesn't re-read the JSON file
+_certificate_cache = {}
+
 
+@functools.cache
 def is_cloud_environment():
-    """Check if we're running in Cloud Functions/Cloud Run"""
-    return bool(
-        os.environ.get('GCP_PROJECT') or 
-        os.environ.get('GCLOUD_PROJECT') or 
-        os.environ.get('FUNCTION_NAME') or 
-        os.environ.get('K_SERVICE')
-    )
+    """
+    Check if we're running in Cloud Functions/Cloud Run
+    
+    The result is cached for the life of the process; call
+    is_cloud_environment.cache_clear() after changing the environment.
+    """
+    return bool(first_env('GCP_PROJECT', 'GCLOUD_PROJECT', 'FUNCTION_NAME', 'K_SERVICE'))
+
+
+@functools.cache
+def resolve_project_id(project_root=None):
+    """
+    Resolve the Firebase project ID once per process.
+    
+    Uses GCP_PROJECT, GCLOUD_PROJECT or PROJECT_ID from the environment (Cloud Functions
+    sets these automatically), falling back to the default project in .firebaserc for
+    local development.
+    
+    Args:
+        project_root: Optional project root path containing .firebaserc
+    
+    Returns:
+        str: Project ID, or None if it could not be resolved
+    """
+    project_id = first_env('GCP_PROJECT', 'GCLOUD_PROJECT', 'PROJECT_ID')
+    if project_id or not project_root:
+        return project_id
+    
+    # For local development, try reading from .firebaserc
+    try:
+        firebaserc_path = Path(project_root) / '.firebaserc'
+        if firebaserc_path.exists():
+            firebaserc = json_loads(firebaserc_path.read_bytes())
+            project_id = firebaserc.get('projects', {}).get('default')
+            if project_id:
+                logger.info(f"Read project ID from .firebaserc: {project_id}")
+    except Exception as e:
+        logger.debug(f"Could not read .firebaserc: {e}")
+    
+    return project_id
+
+
+def _load_certificate(cred_path):
+    """
+    Load a service account certificate, reusing the parsed file while it is unchanged.
+    
+    Args:
+        cred_path: Path to the service account JSON file
+    
+    Returns:
+        credentials.Certificate: Parsed service account credentials
+    """
+    key = (str(cred_path), os.path.getmtime(cred_path))
+    cred = _certificate_cache.get(key)
+    if cred is None:
+        cred = firebase_creds.Certificate(str(cred_path))
+        _certificate_cache[key] = cred
+    return cred
 
 
 def initialize_firebase_admin(project_id=None, project_root=None):
@@ -29,7 +98,7 @@ def initialize_firebase_admin(project_id=None, project_root=None):
     Initialize Firebase Admin SDK with appropriate credentials.
     
     Args:
-        project_id: Optional project ID. If None, will use GCP_PROJECT or PROJECT_ID from env
+        project_id: Optional project ID. If None, will use resolve_project_id()
         project_root: Optional project root path for resolving relative credential paths
     
     Returns:
@@ -42,9 +111,7 @@ def initialize_firebase_admin(project_id=None, project_root=None):
     
     # Get project ID from environment (Cloud Functions sets GCP_PROJECT or GCLOUD_PROJECT automatically)
     if not project_id:
-        project_id = (os.environ.get('GCP_PROJECT') or 
-                     os.environ.get('GCLOUD_PROJECT') or 
-                     os.environ.get('PROJECT_ID'))
+        project_id = resolve_project_id(project_root)
     
     # Check environment
     is_cloud = is_cloud_environment()
@@ -134,7 +201,7 @@ def initialize_firebase_admin(project_id=None, project_root=None):
                 cred_path = Path(project_root) / cred_path
             
             if cred_path.exists():
-                cred = firebase_creds.Certificate(str(cred_path))
+                cred = _load_certificate(cred_path)
                 init_options = {}
                 if project_id:
                     init_options['projectId'] = project_id
@@ -209,3 +276,28 @@ def initialize_firebase_admin(project_id=None, project_root=None):
     except Exception as e:
         logger.error(f"Error initializing Firebase Admin: {e}", exc_info=True)
         raise
+
+
+def init_once(project_root=None):
+    """
+    Initialize Firebase Admin at most once per process.
+    
+    Entry points (main.py and the scheduled functions) call this at import time;
+    later calls return the cached result without re-checking the environment.
+    A failed attempt is not cached, so the next call tries again.
+    
+    Args:
+        project_root: Optional project root path for .firebaserc and relative credential paths
+    
+    Returns:
+        bool: True if initialization succeeded or was already initialized
+    """
+    # Resolve so that equivalent paths (relative, absolute, str or Path) share one cache entry
+    root = str(Path(project_root).resolve()) if project_root is not None else None
+    return _init_once_cached(root)
+
+
+@functools.cache
+def _init_once_cached(project_root):
+    with _init_lock:
+        return initialize_firebase_admin(project_root=project_root)
@@ -137,8 +137,8 @@ def get_hidden_projects_count(collection, user_id: str) -> int:
     try:
         current_user_id, old_user_id = resolve_user_id_for_query(user_id)
         
-        # Try with current user_id first
-        query = collection.where(filter=FieldFilter('user_id', '==', current_user_id)).stream()
+        # Try with current user_id first (ID-only projection, only the count is needed)
+        query = collection.where(filter=FieldFilter('user_id', '==', current_user_id)).select([]).stream()
         count = sum(1 for _ in query)
         
         # If no results and we have old_user_id, try that and migrate
@@ -500,8 +500,8 @@ def get_all_hidden_projects(
         # Check if we need to migrate first (only check once, not on every query)
         if old_user_id:
             # Quick check if migration is needed
-            check_query = collection.where(filter=FieldFilter('user_id', '==', old_user_id)).limit(1).stream()
-            if list(check_query):
+            check_query = collection.where(filter=FieldFilter('user_id', '==', old_user_id)).select([]).limit(1).stream()
+            if next(check_query, None) is not None:
                 # Migration needed - but don't do it here, let it happen in background
                 # For now, we'll query both and merge results
                 pass
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+HTTP helpers shared by the outbound API clients
+"""
+
+import os
+from urllib3.util.retry import Retry
+
+# Longest wait honored from a server's Retry-After header. Retries run inside the
+# calling request, so a large value must not stall a page load or a scheduled run
+RETRY_AFTER_MAX_SECONDS = float(os.environ.get('RETRY_AFTER_MAX_SECONDS', '10'))
+
+
+class CappedRetry(Retry):
+    """urllib3 Retry that clamps Retry-After waits to RETRY_AFTER_MAX_SECONDS"""
+
+    def get_retry_after(self, response):
+        """
+        Read the Retry-After header of a response, capped at RETRY_AFTER_MAX_SECONDS
+        
+        Args:
+            response: urllib3 response being retried
+            
+        Returns:
+            Seconds to wait, or None if the header is absent
+        """
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX_SECONDS)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+JSON helpers for hot parsing paths
+Uses orjson when it is installed and falls back to the standard library
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """
+    Parse JSON from bytes or str
+    
+    Args:
+        data: JSON document as bytes or str (bytes avoids a decode step with orjson)
+        
+    Returns:
+        Parsed Python object
+        
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep catching that
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False):
+    """
+    Serialize an object to a JSON string
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None)
@@ -25,6 +25,9 @@ except ImportError:
     from services.email_service import send_weekly_summary_email, send_session_token_expired_email
     from services.user_service import get_email_by_user_id
 
+# Number of user documents read per query when scanning all users
+USER_SCAN_PAGE_SIZE = 500
+
 
 def start_notification_scheduler(check_interval_hours: int = 1, token_check_interval_hours: int = 12):
     """
@@ -61,9 +64,99 @@ def start_notification_scheduler(check_interval_hours: int = 1, token_check_inte
     return thread
 
 
-def check_and_send_weekly_notifications():
+def _iter_user_ids(users_collection, page_size=USER_SCAN_PAGE_SIZE):
     """
-    Check and send weekly project summary notifications
+    Stream the IDs of all users, one page at a time
+    
+    Only document IDs are needed, so no user fields are read. Each page is a separate
+    bounded query resumed from the last document, so a long scan never holds one
+    stream open across every user.
+    
+    Args:
+        users_collection: Firestore users collection
+        page_size: Number of users per query (default: USER_SCAN_PAGE_SIZE)
+        
+    Yields:
+        str: User ID
+    """
+    query = users_collection.select([]).order_by('__name__').limit(page_size)
+    last_doc = None
+    while True:
+        page_query = query.start_after(last_doc) if last_doc is not None else query
+        docs = list(page_query.stream())
+        for user_doc in docs:
+            if user_doc.id:
+                yield user_doc.id
+        
+        if len(docs) < page_size:
+            break
+        last_doc = docs[-1]
+
+
+def _send_weekly_notification_for_user(user_id):
+    """
+    Send the weekly project summary to a user if it is due
+    
+    Args:
+        user_id: User ID
+    """
+    # Check if notification should be sent
+    if not should_send_weekly_notification(user_id):
+        return
+    
+    # Get user email
+    email = get_email_by_user_id(user_id)
+    if not email:
+        print(f"[Notifications] Skipping user {user_id}: no email found")
+        return
+    
+    # Get visible projects count
+    project_count = get_visible_projects_count(user_id)
+    
+    # Send email
+    try:
+        send_weekly_summary_email(email, project_count)
+        print(f"[Notifications] Sent weekly summary to {email} ({project_count} projects)")
+        
+        # Mark as sent
+        mark_weekly_notification_sent(user_id)
+    except Exception as e:
+        print(f"[Notifications] Failed to send weekly summary to {email}: {e}")
+        # Don't mark as sent if email failed
+
+
+def _send_token_expiration_notification_for_user(user_id):
+    """
+    Send the session token expiration notification to a user if it is due
+    
+    Args:
+        user_id: User ID
+    """
+    # Check if notification should be sent
+    if not should_send_token_expiration_notification(user_id):
+        return
+    
+    # Get user email
+    email = get_email_by_user_id(user_id)
+    if not email:
+        print(f"[Notifications] Skipping user {user_id}: no email found")
+        return
+    
+    # Send email
+    try:
+        send_session_token_expired_email(email)
+        print(f"[Notifications] Sent token expiration notification to {email}")
+        
+        # Mark as sent
+        mark_token_expiration_notification_sent(user_id)
+    except Exception as e:
+        print(f"[Notifications] Failed to send token expiration notification to {email}: {e}")
+        # Don't mark as sent if email failed
+
+
+def check_and_send_all_notifications():
+    """
+    Check and send weekly summary and token expiration notifications in a single pass over users
     """
     try:
         # Import collections from db module
@@ -77,39 +170,52 @@ def check_and_send_weekly_notifications():
         
         # Get all users (not just those with notification preferences)
         # This ensures new users get default preferences created
-        users = users_collection.stream()
-        
-        for user_doc in users:
-            user_id = user_doc.id
-            if not user_id:
+        for user_id in _iter_user_ids(users_collection):
+            try:
+                # Load preferences (this will auto-create defaults if they don't exist)
+                load_notification_preferences(user_id, auto_create=True)
+            except Exception as e:
+                print(f"[Notifications] Error loading notification preferences for user {user_id}: {e}")
                 continue
             
+            try:
+                _send_weekly_notification_for_user(user_id)
+            except Exception as e:
+                print(f"[Notifications] Error processing weekly notification for user {user_id}: {e}")
+            
+            try:
+                _send_token_expiration_notification_for_user(user_id)
+            except Exception as e:
+                print(f"[Notifications] Error processing token expiration notification for user {user_id}: {e}")
+                
+    except Exception as e:
+        print(f"[Notifications] Error checking notifications: {e}")
+        import traceback
+        print(traceback.format_exc())
+
+
+def check_and_send_weekly_notifications():
+    """
+    Check and send weekly project summary notifications
+    """
+    try:
+        # Import collections from db module
+        try:
+            from .db import users_collection
+        except ImportError:
+            from db import users_collection
+        
+        if users_collection is None:
+            return
+        
+        # Get all users (not just those with notification preferences)
+        # This ensures new users get default preferences created
+        for user_id in _iter_user_ids(users_collection):
             try:
                 # Load preferences (this will auto-create defaults if they don't exist)
                 load_notification_preferences(user_id, auto_create=True)
                 
-                # Check if notification should be sent
-                if should_send_weekly_notification(user_id):
-                    # Get user email
-                    email = get_email_by_user_id(user_id)
-                    if not email:
-                        print(f"[Notifications] Skipping user {user_id}: no email found")
-                        continue
-                    
-                    # Get visible projects count
-                    project_count = get_visible_projects_count(user_id)
-                    
-                    # Send email
-                    try:
-                        send_weekly_summary_email(email, project_count)
-                        print(f"[Notifications] Sent weekly summary to {email} ({project_count} projects)")
-                        
-                        # Mark as sent
-                        mark_weekly_notification_sent(user_id)
-                    except Exception as e:
-                        print(f"[Notifications] Failed to send weekly summary to {email}: {e}")
-                        # Don't mark as sent if email failed
-                        
+                _send_weekly_notification_for_user(user_id)
             except Exception as e:
                 print(f"[Notifications] Error processing weekly notification for user {user_id}: {e}")
                 # Continue with next user
@@ -137,36 +243,12 @@ def check_and_send_token_expiration_notifications():
         
         # Get all users (not just those with notification preferences)
         # This ensures new users get default preferences created
-        users = users_collection.stream()
-        
-        for user_doc in users:
-            user_id = user_doc.id
-            if not user_id:
-                continue
-            
+        for user_id in _iter_user_ids(users_collection):
             try:
                 # Load preferences (this will auto-create defaults if they don't exist)
                 load_notification_preferences(user_id, auto_create=True)
                 
-                # Check if notification should be sent
-                if should_send_token_expiration_notification(user_id):
-                    # Get user email
-                    email = get_email_by_user_id(user_id)
-                    if not email:
-                        print(f"[Notifications] Skipping user {user_id}: no email found")
-                        continue
-                    
-                    # Send email
-                    try:
-                        send_session_token_expired_email(email)
-                        print(f"[Notifications] Sent token expiration notification to {email}")
-                        
-                        # Mark as sent
-                        mark_token_expiration_notification_sent(user_id)
-                    except Exception as e:
-                        print(f"[Notifications] Failed to send token expiration notification to {email}: {e}")
-                        # Don't mark as sent if email failed
-                        
+                _send_token_expiration_notification_for_user(user_id)
             except Exception as e:
                 print(f"[Notifications] Error processing token expiration notification for user {user_id}: {e}")
                 # Continue with next user
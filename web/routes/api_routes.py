@@ -22,7 +22,7 @@ try:
     from ..services.user_service import load_user_config, save_user_config, load_user_filters, save_user_filters, update_last_synced, update_user_onboarding_status, get_user_onboarding_status, get_projects_processed_count, get_user_billing_info, check_user_has_credits, is_admin, update_user_billing_limit, check_and_send_credit_notifications
     from ..services.respondent_auth_service import create_respondent_session, verify_respondent_authentication, fetch_and_store_user_profile
     from ..services.project_service import (
-        fetch_respondent_projects, fetch_all_respondent_projects, hide_project_via_api,
+        fetch_respondent_projects, fetch_all_respondent_projects, hide_project_via_api, hide_projects_via_api,
         get_hidden_count, process_and_hide_projects, get_hide_progress, hide_progress
     )
     from ..cache_manager import get_cached_projects, get_cache_stats, mark_projects_hidden_in_cache, get_cached_project_details, is_cache_fresh
@@ -30,14 +30,7 @@ try:
         get_hidden_projects_count, get_hidden_projects_timeline, get_hidden_projects_stats,
         get_all_hidden_projects, get_last_sync_time
     )
-    from ..ai_analyzer import (
-        generate_question_from_project, find_similar_projects, generate_hide_suggestions
-    )
-    from ..preference_learner import (
-        record_project_hidden, store_question_answer, get_user_preferences, should_hide_based_on_ai_preferences,
-        analyze_feedback_and_learn
-    )
-    from ..services.filter_service import should_hide_project, get_project_is_remote
+    from ..services.filter_service import build_hide_predicate, get_project_is_remote
     from ..db import (
         projects_cache_collection, hidden_projects_log_collection, user_preferences_collection, topics_collection,
         project_details_collection, ai_analysis_cache_collection
@@ -48,7 +41,7 @@ except ImportError:
     from services.user_service import load_user_config, save_user_config, load_user_filters, save_user_filters, update_last_synced, update_user_onboarding_status, get_user_onboarding_status, get_projects_processed_count, get_user_billing_info, check_user_has_credits, is_admin, update_user_billing_limit, check_and_send_credit_notifications
     from services.respondent_auth_service import create_respondent_session, verify_respondent_authentication, fetch_and_store_user_profile
     from services.project_service import (
-        fetch_respondent_projects, fetch_all_respondent_projects, hide_project_via_api,
+        fetch_respondent_projects, fetch_all_respondent_projects, hide_project_via_api, hide_projects_via_api,
         get_hidden_count, process_and_hide_projects, get_hide_progress, hide_progress
     )
     from cache_manager import get_cached_projects, get_cache_stats, mark_projects_hidden_in_cache, get_cached_project_details, is_cache_fresh
@@ -56,14 +49,7 @@ except ImportError:
         get_hidden_projects_count, get_hidden_projects_timeline, get_hidden_projects_stats,
         get_all_hidden_projects, get_last_sync_time
     )
-    from ai_analyzer import (
-        generate_question_from_project, find_similar_projects, generate_hide_suggestions
-    )
-    from preference_learner import (
-        record_project_hidden, store_question_answer, get_user_preferences, should_hide_based_on_ai_preferences,
-        analyze_feedback_and_learn
-    )
-    from services.filter_service import should_hide_project, get_project_is_remote
+    from services.filter_service import build_hide_predicate, get_project_is_remote
     from db import (
         projects_cache_collection, hidden_projects_log_collection, user_preferences_collection, topics_collection,
         project_details_collection, ai_analysis_cache_collection
@@ -73,6 +59,26 @@ except ImportError:
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+
+# The AI analyzer and preference learner are only needed by the hide/question
+# routes, so they're imported on first use rather than at app start-up
+def _ai_analyzer():
+    """Return the ai_analyzer module, importing it on first use"""
+    try:
+        from .. import ai_analyzer
+    except ImportError:
+        import ai_analyzer
+    return ai_analyzer
+
+
+def _preference_learner():
+    """Return the preference_learner module, importing it on first use"""
+    try:
+        from .. import preference_learner
+    except ImportError:
+        import preference_learner
+    return preference_learner
+
 # Store progress for preview-hide operations (in-memory)
 preview_hide_progress = {}
 
@@ -480,20 +486,21 @@ def preview_hide():
         # Pass user_id and user_preferences_collection for AI filtering when hide_using_ai is enabled
         hide_using_ai = filters.get('hide_using_ai', False)
         
+        should_hide = build_hide_predicate(
+            filters,
+            project_details_collection=project_details_collection,
+            user_id=user_id_str if hide_using_ai else None,
+            user_preferences_collection=user_preferences_collection if hide_using_ai else None,
+            ai_analysis_cache_collection=ai_analysis_cache_collection if hide_using_ai else None
+        )
+        
         projects_to_hide = []
         for idx, project in enumerate(all_projects):
             # Update progress
             preview_hide_progress[user_id_str]['current'] = idx + 1
             
             # Check if project should be hidden
-            if should_hide_project(
-                project, 
-                filters, 
-                project_details_collection=project_details_collection,
-                user_id=user_id_str if hide_using_ai else None,
-                user_preferences_collection=user_preferences_collection if hide_using_ai else None,
-                ai_analysis_cache_collection=ai_analysis_cache_collection if hide_using_ai else None
-            ):
+            if should_hide(project):
                 preview_hide_progress[user_id_str]['matched'] += 1
                 
                 # Calculate hourly rate for display
@@ -649,7 +656,7 @@ def hide_project():
             project_data = {'id': project_id, 'name': '', 'description': ''}
         
         if user_preferences_collection is not None and hidden_projects_log_collection is not None:
-            record_project_hidden(
+            _preference_learner().record_project_hidden(
                 hidden_projects_log_collection,
                 user_preferences_collection,
                 user_id,
@@ -660,7 +667,7 @@ def hide_project():
             
             # Analyze feedback and learn patterns if feedback was provided
             if feedback_text and project_data:
-                analyze_feedback_and_learn(
+                _preference_learner().analyze_feedback_and_learn(
                     user_preferences_collection,
                     user_id,
                     project_id,
@@ -674,10 +681,10 @@ def hide_project():
         question = None
         if not feedback_text and project_data and hidden_method != 'applied':
             # Check if we've already asked this type of question before
-            prefs = get_user_preferences(user_preferences_collection, user_id) if user_preferences_collection is not None else {}
+            prefs = _preference_learner().get_user_preferences(user_preferences_collection, user_id) if user_preferences_collection is not None else {}
             existing_question_ids = {qa.get('question_id') for qa in prefs.get('question_answers', [])}
             
-            question_data = generate_question_from_project(project_data)
+            question_data = _ai_analyzer().generate_question_from_project(project_data)
             if question_data and question_data.get('id') not in existing_question_ids:
                 question = question_data
         
@@ -726,7 +733,7 @@ def get_hide_suggestions():
             return jsonify({'error': 'Project not found'}), 404
         
         # Generate suggestions
-        suggestions = generate_hide_suggestions(project_data)
+        suggestions = _ai_analyzer().generate_hide_suggestions(project_data)
         
         return jsonify({
             'success': True,
@@ -769,7 +776,7 @@ def answer_question():
         
         # Store the answer
         if user_preferences_collection is not None:
-            store_question_answer(
+            _preference_learner().store_question_answer(
                 user_preferences_collection,
                 user_id,
                 question_id,
@@ -797,7 +804,7 @@ def answer_question():
                         all_projects = cached.get('projects', [])
                         
                         # Find similar projects using the pattern
-                        similar_projects = find_similar_projects(
+                        similar_projects = _ai_analyzer().find_similar_projects(
                             user_id,
                             project_id or '',
                             all_projects,
@@ -805,7 +812,7 @@ def answer_question():
                         )
                         
                         # Filter out already hidden projects
-                        prefs = get_user_preferences(user_preferences_collection, user_id) if user_preferences_collection is not None else {}
+                        prefs = _preference_learner().get_user_preferences(user_preferences_collection, user_id) if user_preferences_collection is not None else {}
                         hidden_projects = set(prefs.get('hidden_projects', []))
                         
                         projects_to_hide = [p for p in similar_projects if p.get('id') not in hidden_projects]
@@ -815,14 +822,12 @@ def answer_question():
                                 cookies=config.get('cookies', {})
                             )
                             
-                            for project in projects_to_hide[:20]:  # Limit to 20 to avoid rate limiting
-                                proj_id = project.get('id')
-                                if proj_id:
-                                    success = hide_project_via_api(req_session, proj_id)
-                                    if success:
-                                        auto_hidden_ids.append(proj_id)
-                                        auto_hidden_count += 1
-                                        time.sleep(0.1)
+                            # Limit to 20 to avoid rate limiting
+                            hide_ids = [project.get('id') for project in projects_to_hide[:20] if project.get('id')]
+                            for proj_id, success in hide_projects_via_api(req_session, hide_ids):
+                                if success:
+                                    auto_hidden_ids.append(proj_id)
+                                    auto_hidden_count += 1
                             
                             # Update cache and log
                             if projects_cache_collection is not None and auto_hidden_ids:
@@ -830,7 +835,7 @@ def answer_question():
                             
                             if hidden_projects_log_collection is not None and user_preferences_collection is not None:
                                 for proj_id in auto_hidden_ids:
-                                    record_project_hidden(
+                                    _preference_learner().record_project_hidden(
                                         hidden_projects_log_collection,
                                         user_preferences_collection,
                                         user_id,
@@ -1218,49 +1223,41 @@ def refresh_cache():
                     print(f"[Cache Refresh] AI-based hiding is enabled, checking {len(all_projects)} projects")
                     
                     # Find projects that should be hidden based on AI preferences
-                    projects_to_hide = []
-                    for project in all_projects:
-                        if should_hide_project(
-                            project,
-                            filters,
-                            project_details_collection=project_details_collection,
-                            user_id=user_id,
-                            user_preferences_collection=user_preferences_collection,
-                            ai_analysis_cache_collection=ai_analysis_cache_collection
-                        ):
-                            projects_to_hide.append(project)
+                    should_hide = build_hide_predicate(
+                        filters,
+                        project_details_collection=project_details_collection,
+                        user_id=user_id,
+                        user_preferences_collection=user_preferences_collection,
+                        ai_analysis_cache_collection=ai_analysis_cache_collection
+                    )
+                    projects_to_hide = [project for project in all_projects if should_hide(project)]
                     
                     print(f"[Cache Refresh] Found {len(projects_to_hide)} projects to hide based on AI preferences")
                     
-                    # Hide each project via API
-                    for project in projects_to_hide:
-                        project_id = project.get('id')
-                        if project_id:
-                            try:
-                                success = hide_project_via_api(req_session, project_id)
-                                if success:
-                                    hidden_count += 1
-                                    hidden_project_ids.append(project_id)
-                                    
-                                    # Log the hidden project
-                                    if hidden_projects_log_collection is not None and user_preferences_collection is not None:
-                                        record_project_hidden(
-                                            hidden_projects_log_collection,
-                                            user_preferences_collection,
-                                            user_id,
-                                            project_id,
-                                            feedback_text=None,
-                                            hidden_method='ai_auto'
-                                        )
-                                else:
-                                    errors.append(project_id)
-                                    print(f"[Cache Refresh] Failed to hide project {project_id}")
-                            except Exception as e:
+                    # Hide projects via API concurrently
+                    hide_ids = [project.get('id') for project in projects_to_hide if project.get('id')]
+                    for project_id, success in hide_projects_via_api(req_session, hide_ids):
+                        try:
+                            if success:
+                                hidden_count += 1
+                                hidden_project_ids.append(project_id)
+                                
+                                # Log the hidden project
+                                if hidden_projects_log_collection is not None and user_preferences_collection is not None:
+                                    _preference_learner().record_project_hidden(
+                                        hidden_projects_log_collection,
+                                        user_preferences_collection,
+                                        user_id,
+                                        project_id,
+                                        feedback_text=None,
+                                        hidden_method='ai_auto'
+                                    )
+                            else:
                                 errors.append(project_id)
-                                print(f"[Cache Refresh] Error hiding project {project_id}: {e}")
-                            
-                            # Small delay to avoid rate limiting
-                            time.sleep(0.1)
+                                print(f"[Cache Refresh] Failed to hide project {project_id}")
+                        except Exception as e:
+                            errors.append(project_id)
+                            print(f"[Cache Refresh] Error hiding project {project_id}: {e}")
                     
                     # Update cache to mark projects as hidden
                     if projects_cache_collection is not None and hidden_project_ids:
@@ -4,6 +4,7 @@ Authentication routes for Respondent.io Manager
 """
 
 import json
+from pathlib import Path
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for
 from google.cloud.firestore_v1.base_query import FieldFilter
 
@@ -25,6 +26,15 @@ except ImportError:
     from services.email_service import send_login_email
     from auth.firebase_auth import require_auth, get_id_token_from_request, verify_firebase_token
 
+# Import Firebase project ID resolution
+try:
+    from ..firebase_init import resolve_project_id
+except ImportError:
+    from firebase_init import resolve_project_id
+
+# Project root containing .firebaserc
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
 bp = Blueprint('auth', __name__)
 
 
@@ -49,23 +59,8 @@ def firebase_config():
     import os
     from flask import jsonify
     
-    # Get Firebase project ID
-    project_id = (os.environ.get('GCP_PROJECT') or 
-                 os.environ.get('GCLOUD_PROJECT') or 
-                 os.environ.get('PROJECT_ID'))
-    
-    if not project_id:
-        # Try reading from .firebaserc
-        try:
-            import json
-            from pathlib import Path
-            firebaserc_path = Path(__file__).parent.parent.parent / '.firebaserc'
-            if firebaserc_path.exists():
-                with open(firebaserc_path, 'r') as f:
-                    firebaserc = json.load(f)
-                    project_id = firebaserc.get('projects', {}).get('default')
-        except Exception:
-            pass
+    # Get Firebase project ID (environment first, then .firebaserc; resolved once per process)
+    project_id = resolve_project_id(PROJECT_ROOT)
     
     # Firebase web app config
     # Note: These values should be set in environment variables or config file
@@ -13,6 +13,33 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent
 TEMPLATES_DIR = BASE_DIR / 'templates' / 'email'
 
+# Parsed email templates keyed by (path, mtime_ns) so repeated sends skip the disk read
+_template_cache = {}
+
+
+def _load_template(name):
+    """
+    Load an email template from TEMPLATES_DIR, reusing the cached text until the file changes
+    
+    Args:
+        name: Template file name (e.g. 'weekly_summary.html')
+        
+    Returns:
+        Template text, or None if the file doesn't exist
+    """
+    template_path = TEMPLATES_DIR / name
+    try:
+        mtime_ns = template_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    
+    key = (str(template_path), mtime_ns)
+    template = _template_cache.get(key)
+    if template is None:
+        template = template_path.read_bytes().decode('utf-8')
+        _template_cache[key] = template
+    return template
+
 
 def get_smtp_config():
     """Get SMTP configuration from environment variables"""
@@ -82,11 +109,8 @@ def send_verification_email(email, token):
     verification_url = f"{config['app_url']}/api/verify-email/{token}"
     
     # Load email template
-    template_path = TEMPLATES_DIR / 'verification.html'
-    if template_path.exists():
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
-    else:
+    html_template = _load_template('verification.html')
+    if html_template is None:
         # Fallback template if file doesn't exist
         html_template = """
         <!DOCTYPE html>
@@ -210,11 +234,8 @@ def send_weekly_summary_email(email, project_count):
     notifications_url = f"{config['app_url']}/notifications"
     
     # Load email template
-    template_path = TEMPLATES_DIR / 'weekly_summary.html'
-    if template_path.exists():
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
-    else:
+    html_template = _load_template('weekly_summary.html')
+    if html_template is None:
         # Fallback template if file doesn't exist
         html_template = """
         <!DOCTYPE html>
@@ -273,11 +294,8 @@ def send_session_token_expired_email(email):
     notifications_url = f"{config['app_url']}/notifications"
     
     # Load email template
-    template_path = TEMPLATES_DIR / 'session_token_expired.html'
-    if template_path.exists():
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
-    else:
+    html_template = _load_template('session_token_expired.html')
+    if html_template is None:
         # Fallback template if file doesn't exist
         html_template = """
         <!DOCTYPE html>
@@ -427,14 +445,13 @@ def send_credits_low_email(user_email, projects_remaining, projects_limit):
     app_url = config.get('app_url', 'http://localhost:5000')
     
     # Load HTML template
-    template_path = TEMPLATES_DIR / 'credits_low.html'
-    if template_path.exists():
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_body = f.read().format(
-                projects_remaining=projects_remaining,
-                projects_limit=projects_limit,
-                support_url=f"{app_url}/support"
-            )
+    html_template = _load_template('credits_low.html')
+    if html_template is not None:
+        html_body = html_template.format(
+            projects_remaining=projects_remaining,
+            projects_limit=projects_limit,
+            support_url=f"{app_url}/support"
+        )
     else:
         # Fallback HTML if template doesn't exist
         html_body = f"""
@@ -481,13 +498,12 @@ def send_credits_exhausted_email(user_email, projects_limit):
     app_url = config.get('app_url', 'http://localhost:5000')
     
     # Load HTML template
-    template_path = TEMPLATES_DIR / 'credits_exhausted.html'
-    if template_path.exists():
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_body = f.read().format(
-                projects_limit=projects_limit,
-                support_url=f"{app_url}/support"
-            )
+    html_template = _load_template('credits_exhausted.html')
+    if html_template is not None:
+        html_body = html_template.format(
+            projects_limit=projects_limit,
+            support_url=f"{app_url}/support"
+        )
     else:
         # Fallback HTML if template doesn't exist
         html_body = f"""
@@ -6,6 +6,8 @@ Project fetching and management service for Respondent.io Manager
 import json
 import time
 import requests
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import database collections
 try:
@@ -15,6 +17,12 @@ except ImportError:
     from web.db import projects_cache_collection, hidden_projects_log_collection, project_details_collection, topics_collection, user_preferences_collection, ai_analysis_cache_collection
     from services.user_service import check_user_has_credits, get_user_billing_info, check_and_send_credit_notifications
 
+# Import JSON helpers
+try:
+    from ..json_utils import loads as json_loads
+except ImportError:
+    from json_utils import loads as json_loads
+
 # Import cache manager
 try:
     from ..cache_manager import is_cache_fresh, get_cached_projects, refresh_project_cache, mark_projects_hidden_in_cache, get_cached_project_details, cache_project_details
@@ -36,22 +44,45 @@ except ImportError:
 # Import respondent auth service
 try:
     from .respondent_auth_service import (
-        verify_respondent_authentication, get_user_profile, extract_demographic_params_from_mongodb
+        verify_respondent_authentication, get_user_profile, extract_demographic_params_from_mongodb,
+        response_snippet
     )
 except ImportError:
     from services.respondent_auth_service import (
-        verify_respondent_authentication, get_user_profile, extract_demographic_params_from_mongodb
+        verify_respondent_authentication, get_user_profile, extract_demographic_params_from_mongodb,
+        response_snippet
     )
 
 # Import filter service
 try:
-    from .filter_service import should_hide_project
+    from .filter_service import build_hide_predicate
 except ImportError:
-    from services.filter_service import should_hide_project
+    from services.filter_service import build_hide_predicate
 
 # Store progress for each user (in-memory, could be moved to Redis/MongoDB for persistence)
 hide_progress = {}
 
+# Number of result pages fetched concurrently once the total page count is known
+PAGE_FETCH_CONCURRENCY = 8
+
+# Number of project details requests in flight at once while enriching search results
+DETAILS_FETCH_CONCURRENCY = 8
+
+# Maximum number of hide requests in flight at once (kept small to respect rate limits)
+HIDE_CONCURRENCY = 8
+
+# Fixed query parameters for the project search endpoint (read-only)
+PROJECT_SEARCH_DEFAULTS = MappingProxyType({
+    "maxIncentive": 1000,
+    "minIncentive": 5,
+    "maxTimeMinutesRequired": 800,
+    "minTimeMinutesRequired": 5,
+    "includeCount": "true",
+    "showHiddenProjects": "false",
+    "onlyShowMatched": "false",
+    "showEligible": "true",
+})
+
 
 def fetch_project_details(session, project_id, project_details_collection=None):
     """
@@ -88,7 +119,7 @@ def fetch_project_details(session, project_id, project_details_collection=None):
         
         # Check if response is successful
         if not response.ok:
-            print(f"[Project Details] ERROR: {response.status_code} - {response.text[:500]}")
+            print(f"[Project Details] ERROR: {response.status_code} - {response_snippet(response)}")
             # If we have cached data, return it even if API fails
             if project_details_collection is not None:
                 cached_details = get_cached_project_details(project_details_collection, project_id)
@@ -99,7 +130,7 @@ def fetch_project_details(session, project_id, project_details_collection=None):
         
         # Parse JSON response
         try:
-            data = response.json()
+            data = json_loads(response.content)
             
             # Extract the 'response' field which contains the actual project data
             # The API returns a wrapper with 'response', 'details', etc.
@@ -142,8 +173,43 @@ def fetch_project_details(session, project_id, project_details_collection=None):
         return None
 
 
+def build_project_search_params(page_size=50, gender=None, education_level=None, ethnicity=None,
+                                date_of_birth=None, country=None, sort="v4Score"):
+    """
+    Build the query parameters for the project search endpoint, excluding the page number
+    
+    Args:
+        page_size: Number of results per page (default: 50)
+        gender: Optional gender filter (e.g., "male")
+        education_level: Optional education level filter (e.g., "bachelordegree")
+        ethnicity: Optional ethnicity filter (e.g., "whitecaucasian")
+        date_of_birth: Optional date of birth filter (e.g., "1988-06-22")
+        country: Optional country filter (e.g., "US")
+        sort: Sort order (default: "v4Score", can be "respondentRemuneration")
+        
+    Returns:
+        Dictionary of query parameters shared by every page of a search
+    """
+    params = dict(PROJECT_SEARCH_DEFAULTS, sort=sort, pageSize=page_size)
+    
+    # Add optional demographic parameters if provided
+    if gender:
+        params["gender"] = gender
+    if education_level:
+        params["educationLevel"] = education_level
+    if ethnicity:
+        params["ethnicity"] = ethnicity
+    if date_of_birth:
+        params["dateOfBirth"] = date_of_birth
+    if country:
+        params["country"] = country
+    
+    return params
+
+
 def fetch_respondent_projects(session, profile_id, page_size=50, page=1, user_id=None, use_cache=True, 
-                               gender=None, education_level=None, ethnicity=None, date_of_birth=None, country=None, sort="v4Score"):
+                               gender=None, education_level=None, ethnicity=None, date_of_birth=None, country=None, sort="v4Score",
+                               base_params=None):
     """
     Fetch projects from Respondent.io API, checking cache first if available
     
@@ -160,6 +226,8 @@ def fetch_respondent_projects(session, profile_id, page_size=50, page=1, user_id
         date_of_birth: Optional date of birth filter (e.g., "1988-06-22")
         country: Optional country filter (e.g., "US")
         sort: Sort order (default: "v4Score", can be "respondentRemuneration")
+        base_params: Optional prebuilt params from build_project_search_params; when given,
+            the page_size, demographic and sort arguments are ignored
         
     Returns:
         Dictionary containing the API response with projects
@@ -182,31 +250,12 @@ def fetch_respondent_projects(session, profile_id, page_size=50, page=1, user_id
     base_url = "https://app.respondent.io/api/v4/matching/projects/search/profiles"
     
     # Build query parameters
-    params = {
-        "maxIncentive": 1000,
-        "minIncentive": 5,
-        "maxTimeMinutesRequired": 800,
-        "minTimeMinutesRequired": 5,
-        "sort": sort,
-        "pageSize": page_size,
-        "page": page,
-        "includeCount": "true",
-        "showHiddenProjects": "false",
-        "onlyShowMatched": "false",
-        "showEligible": "true",
-    }
-    
-    # Add optional demographic parameters if provided
-    if gender:
-        params["gender"] = gender
-    if education_level:
-        params["educationLevel"] = education_level
-    if ethnicity:
-        params["ethnicity"] = ethnicity
-    if date_of_birth:
-        params["dateOfBirth"] = date_of_birth
-    if country:
-        params["country"] = country
+    if base_params is None:
+        base_params = build_project_search_params(
+            page_size, gender=gender, education_level=education_level, ethnicity=ethnicity,
+            date_of_birth=date_of_birth, country=country, sort=sort
+        )
+    params = dict(base_params, page=page)
     
     # Construct the full URL
     url = f"{base_url}/{profile_id}"
@@ -225,12 +274,13 @@ def fetch_respondent_projects(session, profile_id, page_size=50, page=1, user_id
     
     # Check if response is successful
     if not response.ok:
-        print(f"[Respondent.io API] ERROR: {response.status_code} - {response.text[:500]}")
-        raise Exception(f"Failed to fetch projects: {response.status_code} - {response.text[:500]}")
+        error_snippet = response_snippet(response)
+        print(f"[Respondent.io API] ERROR: {response.status_code} - {error_snippet}")
+        raise Exception(f"Failed to fetch projects: {response.status_code} - {error_snippet}")
     
     # Parse JSON response
     try:
-        data = response.json()
+        data = json_loads(response.content)
         
         # Don't cache single pages - only cache when fetching all pages via fetch_all_respondent_projects
         # This prevents caching incomplete data
@@ -297,16 +347,22 @@ def fetch_all_respondent_projects(session, profile_id, page_size=50, user_id=Non
     total_results = None
     total_pages = None
     
+    # Build the search parameters once; each page only adds its page number
+    search_params = build_project_search_params(
+        page_size,
+        gender=demographic_params.get('gender'),
+        education_level=demographic_params.get('education_level'),
+        ethnicity=demographic_params.get('ethnicity'),
+        date_of_birth=demographic_params.get('date_of_birth'),
+        country=demographic_params.get('country'),
+        sort="respondentRemuneration"
+    )
+    
     # Fetch first page to get totalResults
     try:
         page_data = fetch_respondent_projects(
             session, profile_id, page_size, page=1, user_id=None, use_cache=False,
-            gender=demographic_params.get('gender'),
-            education_level=demographic_params.get('education_level'),
-            ethnicity=demographic_params.get('ethnicity'),
-            date_of_birth=demographic_params.get('date_of_birth'),
-            country=demographic_params.get('country'),
-            sort="respondentRemuneration"
+            base_params=search_params
         )
         
         # Validate response structure
@@ -337,42 +393,49 @@ def fetch_all_respondent_projects(session, profile_id, page_size=50, user_id=Non
             print(f"[Respondent.io API] WARNING: total_pages ({total_pages}) exceeds safety limit ({max_pages}), limiting to {max_pages} pages")
             total_pages = max_pages
         
-        # Fetch remaining pages (2 through total_pages)
-        for page in range(2, total_pages + 1):
+        def fetch_page(page):
             try:
                 page_data = fetch_respondent_projects(
                     session, profile_id, page_size, page=page, user_id=None, use_cache=False,
-                    gender=demographic_params.get('gender'),
-                    education_level=demographic_params.get('education_level'),
-                    ethnicity=demographic_params.get('ethnicity'),
-                    date_of_birth=demographic_params.get('date_of_birth'),
-                    country=demographic_params.get('country'),
-                    sort="respondentRemuneration"
+                    base_params=search_params
                 )
-                
-                # Validate response structure
-                if not isinstance(page_data, dict):
-                    print(f"[Respondent.io API] Invalid response format for page {page}, stopping pagination")
-                    break
-                
-                page_results = page_data.get('results', [])
-                if not isinstance(page_results, list):
-                    print(f"[Respondent.io API] Invalid results format for page {page}, stopping pagination")
-                    break
-                
-                results_count = len(page_results)
-                if results_count == 0:
-                    print(f"[Respondent.io API] Reached last page (got 0 results on page {page})")
-                    break
-                
-                all_projects.extend(page_results)
-                print(f"[Respondent.io API] Fetched page {page}: {results_count} results (total: {len(all_projects)} projects)")
-                
+                return page_data, None
             except Exception as e:
-                print(f"[Respondent.io API] ERROR fetching page {page}: {e}")
-                # For subsequent pages, stop pagination but return what we have
-                print(f"[Respondent.io API] Stopping pagination due to error, returning {len(all_projects)} projects collected so far")
-                break
+                return None, e
+        
+        # Fetch remaining pages (2 through total_pages) concurrently
+        # Results are consumed in page order, so pagination stops at the same point as a serial fetch
+        remaining_pages = range(2, total_pages + 1)
+        if remaining_pages:
+            executor = ThreadPoolExecutor(max_workers=min(PAGE_FETCH_CONCURRENCY, len(remaining_pages)))
+            try:
+                for page, (page_data, error) in zip(remaining_pages, executor.map(fetch_page, remaining_pages)):
+                    if error is not None:
+                        print(f"[Respondent.io API] ERROR fetching page {page}: {error}")
+                        # For subsequent pages, stop pagination but return what we have
+                        print(f"[Respondent.io API] Stopping pagination due to error, returning {len(all_projects)} projects collected so far")
+                        break
+                    
+                    # Validate response structure
+                    if not isinstance(page_data, dict):
+                        print(f"[Respondent.io API] Invalid response format for page {page}, stopping pagination")
+                        break
+                    
+                    page_results = page_data.get('results', [])
+                    if not isinstance(page_results, list):
+                        print(f"[Respondent.io API] Invalid results format for page {page}, stopping pagination")
+                        break
+                    
+                    results_count = len(page_results)
+                    if results_count == 0:
+                        print(f"[Respondent.io API] Reached last page (got 0 results on page {page})")
+                        break
+                    
+                    all_projects.extend(page_results)
+                    print(f"[Respondent.io API] Fetched page {page}: {results_count} results (total: {len(all_projects)} projects)")
+            finally:
+                # Drop any queued page requests once pagination stops early
+                executor.shutdown(wait=False, cancel_futures=True)
         
     except Exception as e:
         print(f"[Respondent.io API] ERROR fetching first page: {e}")
@@ -387,39 +450,52 @@ def fetch_all_respondent_projects(session, profile_id, page_size=50, user_id=Non
     all_topics = []
     enriched_projects = []
     
-    for idx, project in enumerate(all_projects):
+    def fetch_details(project):
         project_id = project.get('id')
         if not project_id:
-            enriched_projects.append(project)
-            continue
-        
+            return None, None
         try:
             # Fetch detailed project information (will check cache first)
-            details = fetch_project_details(session, project_id, project_details_collection)
+            return fetch_project_details(session, project_id, project_details_collection), None
+        except Exception as e:
+            return None, e
+    
+    # Fetch details concurrently while consuming results in project order, so the
+    # next details requests are already in flight while earlier ones are merged
+    with ThreadPoolExecutor(max_workers=DETAILS_FETCH_CONCURRENCY) as executor:
+        for idx, (project, (details, error)) in enumerate(zip(all_projects, executor.map(fetch_details, all_projects))):
+            project_id = project.get('id')
+            if not project_id:
+                enriched_projects.append(project)
+                continue
             
-            if details:
-                # Merge detailed data into project object
-                # The details now contain the project data at root level (after migration/caching)
-                # with screenerQuestionsLength if available
-                merged_project = project.copy()
-                merged_project.update(details)
-                enriched_projects.append(merged_project)
+            try:
+                if error is not None:
+                    raise error
                 
-                # Extract topics from the detailed project
-                project_topics = extract_topics_from_project(merged_project)
-                all_topics.extend(project_topics)
-            else:
-                # If details fetch failed, use original project
+                if details:
+                    # Merge detailed data into project object
+                    # The details now contain the project data at root level (after migration/caching)
+                    # with screenerQuestionsLength if available
+                    merged_project = project.copy()
+                    merged_project.update(details)
+                    enriched_projects.append(merged_project)
+                    
+                    # Extract topics from the detailed project
+                    project_topics = extract_topics_from_project(merged_project)
+                    all_topics.extend(project_topics)
+                else:
+                    # If details fetch failed, use original project
+                    enriched_projects.append(project)
+                    print(f"[Project Details] Warning: Failed to fetch details for project {project_id}, using basic data")
+            except Exception as e:
+                print(f"[Project Details] Error processing project {project_id}: {e}")
+                # Continue with original project if details fetch fails
                 enriched_projects.append(project)
-                print(f"[Project Details] Warning: Failed to fetch details for project {project_id}, using basic data")
-        except Exception as e:
-            print(f"[Project Details] Error processing project {project_id}: {e}")
-            # Continue with original project if details fetch fails
-            enriched_projects.append(project)
-        
-        # Progress update every 10 projects
-        if (idx + 1) % 10 == 0:
-            print(f"[Project Details] Processed {idx + 1}/{len(all_projects)} projects...")
+            
+            # Progress update every 10 projects
+            if (idx + 1) % 10 == 0:
+                print(f"[Project Details] Processed {idx + 1}/{len(all_projects)} projects...")
     
     print(f"[Project Details] Completed fetching details for {len(enriched_projects)} projects")
     
@@ -471,6 +547,34 @@ def hide_project_via_api(session, project_id):
         return False
 
 
+def hide_projects_via_api(session, project_ids, max_workers=HIDE_CONCURRENCY):
+    """
+    Hide multiple projects via Respondent.io API
+    
+    Respondent.io only exposes a per-project hide endpoint, so the POSTs are
+    overlapped through a bounded thread pool sharing the session's connection pool.
+    
+    Args:
+        session: Authenticated requests.Session object
+        project_ids: Iterable of project IDs to hide
+        max_workers: Maximum number of concurrent hide requests (default: HIDE_CONCURRENCY)
+        
+    Yields:
+        tuple: (project_id, success) for each project, in completion order
+    """
+    project_ids = list(project_ids)
+    if not project_ids:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(project_ids))) as executor:
+        futures = {
+            executor.submit(hide_project_via_api, session, project_id): project_id
+            for project_id in project_ids
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
 def get_hidden_count(user_id):
     """Get the current hidden count for a user, handling migration from old user_id to Firebase Auth UID"""
     if hidden_projects_log_collection is None:
@@ -538,17 +642,14 @@ def process_and_hide_projects(user_id, session, profile_id, filters, page_size=5
         auto_hide_enabled = filters.get('auto_hide', False)
         should_check_ai = auto_hide_enabled or hide_using_ai
         
-        projects_to_hide = []
-        for project in all_projects:
-            if should_hide_project(
-                project, 
-                filters, 
-                project_details_collection=project_details_collection,
-                user_id=user_id_str if should_check_ai else None,
-                user_preferences_collection=user_preferences_collection if should_check_ai else None,
-                ai_analysis_cache_collection=ai_analysis_cache_collection if should_check_ai else None
-            ):
-                projects_to_hide.append(project)
+        should_hide = build_hide_predicate(
+            filters,
+            project_details_collection=project_details_collection,
+            user_id=user_id_str if should_check_ai else None,
+            user_preferences_collection=user_preferences_collection if should_check_ai else None,
+            ai_analysis_cache_collection=ai_analysis_cache_collection if should_check_ai else None
+        )
+        projects_to_hide = [project for project in all_projects if should_hide(project)]
         
         total_to_hide = len(projects_to_hide)
         print(f"[Project Service] Found {total_to_hide} projects to hide out of {len(all_projects)} total projects")
@@ -561,29 +662,24 @@ def process_and_hide_projects(user_id, session, profile_id, filters, page_size=5
         auto_hide_enabled = filters.get('auto_hide', False)
         hidden_method = 'auto' if auto_hide_enabled else 'manual'
         
-        # Hide each project
-        for idx, project in enumerate(projects_to_hide):
-            project_id = project.get('id')
-            if project_id:
-                hide_progress[user_id_str]['current'] = idx + 1
-                success = hide_project_via_api(session, project_id)
-                if success:
-                    hidden_count += 1
-                    hidden_project_ids.append(project_id)
-                    hide_progress[user_id_str]['hidden'] = hidden_count
-                    # Log to hidden_projects_log with correct method
-                    if hidden_projects_log_collection is not None:
-                        log_hidden_project(
-                            hidden_projects_log_collection,
-                            str(user_id),
-                            project_id,
-                            hidden_method
-                        )
-                else:
-                    errors.append(project_id)
-                
-                # Small delay to avoid rate limiting
-                time.sleep(0.1)
+        # Hide projects concurrently; results are recorded on this thread as they complete
+        project_ids = [project.get('id') for project in projects_to_hide if project.get('id')]
+        for idx, (project_id, success) in enumerate(hide_projects_via_api(session, project_ids)):
+            hide_progress[user_id_str]['current'] = idx + 1
+            if success:
+                hidden_count += 1
+                hidden_project_ids.append(project_id)
+                hide_progress[user_id_str]['hidden'] = hidden_count
+                # Log to hidden_projects_log with correct method
+                if hidden_projects_log_collection is not None:
+                    log_hidden_project(
+                        hidden_projects_log_collection,
+                        str(user_id),
+                        project_id,
+                        hidden_method
+                    )
+            else:
+                errors.append(project_id)
         
         # Update cache to remove hidden projects
         if projects_cache_collection is not None and hidden_project_ids:
@@ -3,8 +3,12 @@
 Respondent.io authentication and session management service
 """
 
+import os
 import time
+import hashlib
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 from google.cloud.firestore_v1.base_query import FieldFilter
 
@@ -14,12 +18,60 @@ try:
 except ImportError:
     from web.db import user_profiles_collection
 
+# Import JSON and HTTP helpers
+try:
+    from ..json_utils import loads as json_loads
+    from ..http_utils import CappedRetry
+except ImportError:
+    from json_utils import loads as json_loads
+    from http_utils import CappedRetry
+
 # Import user service for config loading
 try:
     from .user_service import load_user_config
 except ImportError:
     from services.user_service import load_user_config
 
+# Connection pool sizing for app.respondent.io. One host is used for every call,
+# so a single pool sized for concurrent page/hide requests keeps connections alive
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 32
+
+# Retry policy for transient Respondent.io failures (429 and 5xx). Backoff is exponential
+# and a Retry-After header from the server takes precedence over it, up to
+# RETRY_AFTER_MAX_SECONDS. Only GET is retried on a status: a POST (e.g. hiding a
+# project) may already have been applied when a 5xx comes back. Connection errors,
+# where nothing reached the server, are retried for every method
+MAX_RETRIES = int(os.environ.get('RESPONDENT_MAX_RETRIES', '5'))
+RETRY_BACKOFF_FACTOR = float(os.environ.get('RESPONDENT_RETRY_BACKOFF', '0.5'))
+
+
+def _build_retry():
+    """Retry policy for transient Respondent.io failures"""
+    return CappedRetry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True
+    )
+
+
+# Process-wide adapter mounted on every Respondent.io session. Sessions created for
+# different users (e.g. in the scheduled keep-alive and cache refresh runs) share one
+# urllib3 connection pool while keeping their own cookie jars
+_shared_adapter = HTTPAdapter(
+    pool_connections=POOL_CONNECTIONS,
+    pool_maxsize=POOL_MAXSIZE,
+    max_retries=_build_retry()
+)
+
+
+# Successful verify_respondent_authentication results, keyed by cookie hash
+VERIFICATION_CACHE_TTL_SECONDS = 300
+_verification_cache = {}
+_verification_cache_lock = threading.Lock()
+
 
 def create_respondent_session(cookies):
     """
@@ -33,6 +85,9 @@ def create_respondent_session(cookies):
     """
     session = requests.Session()
     
+    # Mount the shared pooled adapter so all requests to app.respondent.io reuse keep-alive connections
+    session.mount("https://", _shared_adapter)
+    
     # Set cookies
     for name, value in cookies.items():
         if value:
@@ -40,16 +95,79 @@ def create_respondent_session(cookies):
     
     # Set headers
     session.headers.update({
-        "X-Requested-With": "XMLHttpRequest"
+        "X-Requested-With": "XMLHttpRequest",
+        "Connection": "keep-alive"
     })
     
     return session
 
 
-def verify_respondent_authentication(cookies):
+def response_snippet(response, limit=500):
+    """
+    Decode the first bytes of a response body for error logging
+    
+    Slices the raw body before decoding, so large error pages are not decoded
+    (or charset-sniffed) in full just to print a prefix.
+    
+    Args:
+        response: requests.Response object
+        limit: Maximum number of bytes to include (default: 500)
+        
+    Returns:
+        Decoded prefix of the response body
+    """
+    return response.content[:limit].decode(response.encoding or 'utf-8', errors='replace')
+
+
+def _cookie_cache_key(cookies):
+    """Stable hash of a cookie dict for keying the verification cache"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name, value in sorted(cookies.items()):
+        digest.update(f"{name}={value}\x00".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def verify_respondent_authentication(cookies, use_cache=True):
     """
     Verify authentication with Respondent.io API using the same logic as CLI
     
+    Successful verifications are cached in-process for VERIFICATION_CACHE_TTL_SECONDS,
+    keyed by a hash of the cookies, so back-to-back checks with unchanged cookies
+    (e.g. verify then fetch_all_respondent_projects) make one request. Failures are
+    never cached.
+    
+    Args:
+        cookies: Dictionary of cookie name-value pairs
+        use_cache: Whether to reuse a recent successful verification (default: True)
+        
+    Returns:
+        Dictionary with 'success' (bool), 'message' (str), and optional 'profile_id' and 'first_name'
+    """
+    cache_key = _cookie_cache_key(cookies or {})
+    now = time.monotonic()
+    if use_cache:
+        with _verification_cache_lock:
+            cached = _verification_cache.get(cache_key)
+        if cached and now - cached[0] < VERIFICATION_CACHE_TTL_SECONDS:
+            return dict(cached[1])
+    
+    result = _request_respondent_authentication(cookies)
+    
+    with _verification_cache_lock:
+        # Drop expired entries so cookies that are no longer used don't accumulate
+        for key in [k for k, (ts, _) in _verification_cache.items() if now - ts >= VERIFICATION_CACHE_TTL_SECONDS]:
+            del _verification_cache[key]
+        if result.get('success'):
+            _verification_cache[cache_key] = (now, dict(result))
+        else:
+            _verification_cache.pop(cache_key, None)
+    return result
+
+
+def _request_respondent_authentication(cookies):
+    """
+    Call Respondent.io's /v2/respondents/me endpoint to verify the cookies
+    
     Args:
         cookies: Dictionary of cookie name-value pairs
         
@@ -59,18 +177,8 @@ def verify_respondent_authentication(cookies):
     auth_url = "https://app.respondent.io/v2/respondents/me"
     
     try:
-        # Create a requests session
-        req_session = requests.Session()
-        
-        # Set cookies
-        for name, value in cookies.items():
-            if value:
-                req_session.cookies.set(name, value)
-        
-        # Set headers
-        req_session.headers.update({
-            "X-Requested-With": "XMLHttpRequest"
-        })
+        # Create a requests session (same pooled configuration as the rest of the app)
+        req_session = create_respondent_session(cookies)
         
         # Make the request
         start_time = time.time()
@@ -82,33 +190,15 @@ def verify_respondent_authentication(cookies):
         # Check response status
         if response.status_code == 200:
             try:
-                user_data = response.json()
-                
-                # Extract profile ID and first name from nested response structure
-                profile_id = None
-                first_name = None
-                user_id = None
+                user_data = json_loads(response.content)
                 
-                if isinstance(user_data, dict) and 'response' in user_data:
-                    response_data = user_data.get('response', {})
-                    
-                    # Get profile ID from response.profile.id
-                    if 'profile' in response_data and isinstance(response_data['profile'], dict):
-                        profile_id = response_data['profile'].get('id')
-                    
-                    # Get first name from response.firstName
-                    first_name = response_data.get('firstName')
-                    
-                    # Get user ID - try different possible locations
-                    if 'id' in response_data:
-                        user_id = response_data.get('id')
-                    elif 'userId' in response_data:
-                        user_id = response_data.get('userId')
-                    elif 'user' in response_data and isinstance(response_data['user'], dict):
-                        user_id = response_data['user'].get('id')
-                    elif 'profile' in response_data and isinstance(response_data['profile'], dict):
-                        # Sometimes user_id might be in profile
-                        user_id = response_data['profile'].get('userId') or response_data['profile'].get('user_id')
+                # Extract profile ID and first name from response.profile.id and response.firstName
+                try:
+                    response_data = user_data['response']
+                    profile_id = response_data['profile']['id']
+                    first_name = response_data['firstName']
+                except (KeyError, TypeError):
+                    profile_id = first_name = None
                 
                 # Check if we got the required fields
                 if not profile_id or not first_name:
@@ -118,6 +208,18 @@ def verify_respondent_authentication(cookies):
                         'status_code': response.status_code
                     }
                 
+                # Get user ID - try different possible locations
+                user_id = None
+                if 'id' in response_data:
+                    user_id = response_data.get('id')
+                elif 'userId' in response_data:
+                    user_id = response_data.get('userId')
+                elif 'user' in response_data and isinstance(response_data['user'], dict):
+                    user_id = response_data['user'].get('id')
+                elif isinstance(response_data['profile'], dict):
+                    # Sometimes user_id might be in profile
+                    user_id = response_data['profile'].get('userId') or response_data['profile'].get('user_id')
+                
                 # Authentication successful
                 result = {
                     'success': True,
@@ -190,10 +292,10 @@ def fetch_user_profile(session, user_id):
         print(f"[Respondent.io API] Response: {response.status_code} ({elapsed_time:.2f}s)")
         
         if response.status_code == 200:
-            profile_data = response.json()
+            profile_data = json_loads(response.content)
             return profile_data
         else:
-            print(f"[Respondent.io API] Failed to fetch profile: {response.status_code} - {response.text[:500]}")
+            print(f"[Respondent.io API] Failed to fetch profile: {response.status_code} - {response_snippet(response)}")
             return None
     except requests.exceptions.Timeout:
         print(f"[Respondent.io API] Profile fetch timed out (this is optional, continuing without demographic filters)")
@@ -796,8 +796,8 @@ def get_projects_processed_count(user_id):
         
         current_user_id, old_user_id = resolve_user_id_for_query(user_id)
         
-        # Count with current user_id first
-        query = hidden_projects_log_collection.where(filter=FieldFilter('user_id', '==', current_user_id)).stream()
+        # Count with current user_id first (ID-only projection, only the count is needed)
+        query = hidden_projects_log_collection.where(filter=FieldFilter('user_id', '==', current_user_id)).select([]).stream()
         count = sum(1 for _ in query)
         
         # If no results and we have old_user_id, count with that and migrate